@@ -1,101 +1,266 @@
 """ ADVENT OF CODE 2023 """
+import os
 import pathlib
+from collections import deque
+from functools import lru_cache
 
 # Day 1
-def day1(file, part2=False) -> None:
+
+# Digits always count as numbers (part 1)
+digits = {str(digit): str(digit) for digit in range(10)}
+
+# Translation dictionary for word-to-number conversion (part 2)
+translate = {
+    'one': '1',
+    'two': '2',
+    'three': '3',
+    'four': '4',
+    'five': '5',
+    'six': '6',
+    'seven': '7',
+    'eight': '8',
+    'nine': '9',
+}
+
+def build_automaton(words: dict) -> tuple:
+    """
+    Build an Aho-Corasick automaton that finds all (also overlapping) words of a dictionary in one pass.
+
+    Parameters:
+    - words (dict): The words to find and the number of each word.
+
+    Returns:
+    tuple: The transitions per state (dict of char to state, other chars lead back to state 0) and the matches per state
+    (length and number of the longest and of the shortest word ending in that state, None if no word ends there).
+    """
+    # Build a trie of the words, keeping the words (length, number) that end in each state
+    transitions = [{}]
+    ends = [[]]
+    for word, number in words.items():
+        state = 0
+        for c in word:
+            if c not in transitions[state]:
+                transitions[state][c] = len(transitions)
+                transitions.append({})
+                ends.append([])
+            state = transitions[state][c]
+        ends[state].append((len(word), number))
+
+    # Walk the trie breadth first to find the fall back of each state (longest suffix that is also in the trie)
+    fallback = [0] * len(transitions)
+    queue = deque(transitions[0].values())
+    while queue:
+        state = queue.popleft()
+        children = list(transitions[state].items())
+        # Words ending in the fall back state end here as well
+        ends[state] = ends[state] + ends[fallback[state]]
+        # Complete the transitions with those of the fall back state (already complete, it is less deep)
+        if state:
+            for c, next_state in transitions[fallback[state]].items():
+                transitions[state].setdefault(c, next_state)
+        for c, child in children:
+            fallback[child] = transitions[fallback[state]].get(c, 0) if state else 0
+            queue.append(child)
+
+    # Keep only what the scanner needs: the longest word starts first, the shortest word starts last
+    matches = []
+    for found in ends:
+        if found:
+            longest = max(found)
+            shortest = min(found)
+            matches.append((longest[0], longest[1], shortest[0], shortest[1]))
+        else:
+            matches.append(None)
+    return (transitions, matches)
+
+def find_first_last(line: str, automaton: tuple) -> tuple:
+    """
+    Find the first and the last number in a line in one pass, words may overlap (threeight).
+
+    Parameters:
+    - line (str): The line to scan.
+    - automaton (tuple): The automaton of the words to find (see build_automaton).
+
+    Returns:
+    tuple: The first and the last number found, (None, None) if there are none.
     """
-    Calculate the sum of numbers in a file. Optionally replace words with numbers based on a translation dictionary.
+    transitions, matches = automaton
+    state = 0
+    first = last = None
+    first_start = len(line)
+    last_start = -1
+    for index, c in enumerate(line):
+        state = transitions[state].get(c, 0)
+        match = matches[state]
+        if match:
+            # A word ending here starts at index - length + 1 (of words starting at the same index the longest wins)
+            if index - match[0] + 1 <= first_start:
+                first_start = index - match[0] + 1
+                first = match[1]
+            if index - match[2] + 1 >= last_start:
+                last_start = index - match[2] + 1
+                last = match[3]
+    return (first, last)
+
+def words_key(words: dict) -> tuple:
+    """
+    Convert a translation dictionary to a hashable (and picklable) key.
+
+    Parameters:
+    - words (dict): Translation dictionary, or None for the default.
+
+    Returns:
+    tuple: The (word, number) pairs, or None for the default.
+    """
+    if words is None:
+        return None
+    return tuple(sorted(words.items()))
+
+@lru_cache(maxsize=None)
+def get_automaton(part2: bool, words: tuple) -> tuple:
+    """
+    Get the automaton of the numbers to find (built once per process): digits, and words for part 2.
+
+    Parameters:
+    - part2 (bool): If True, find words too.
+    - words (tuple): The (word, number) pairs to use for part 2, None for translate.
+
+    Returns:
+    tuple: The automaton (see build_automaton).
+    """
+    vocabulary = dict(digits)
+    if part2:
+        vocabulary.update(translate if words is None else dict(words))
+    return build_automaton(vocabulary)
+
+def calibration_value(line: str, automaton: tuple) -> int:
+    """
+    Calculate the calibration value of a line: the first and the last number combined.
+
+    Parameters:
+    - line (str): The line.
+    - automaton (tuple): The automaton of the numbers to find.
+
+    Returns:
+    int: The calibration value, 0 if the line has no number.
+    """
+    # Keep only the first and last number (the same one if only one is found)
+    first, last = find_first_last(line, automaton)
+    if first is None:
+        return 0
+    return int(first + last)
+
+def day1(file, part2=False, words=None) -> None:
+    """
+    Calculate the sum of numbers in a file. Optionally also count words as numbers based on a translation dictionary.
 
     Parameters:
     - file (str): The name of the input file.
-    - part2 (bool): If True, replace words with numbers before calculating the sum.
+    - part2 (bool): If True, count words as numbers too.
+    - words (dict): Translation dictionary to use for part 2, defaults to translate.
 
     Returns:
     None (prints the sum of numbers)
     """
     # Create a Path object for the input file
     input_file = pathlib.Path(file)
-    # List to store numbers from the file
-    numbers = []
-    
+    automaton = get_automaton(part2, words_key(words))
+    # Running total of the numbers in the file
+    total = 0
+
     # Open the input file for reading
     with input_file.open('r') as file:
         # Iterate through each line in the file
         for line in file:
-            # If part2 is True, replace words with numbers in the line
-            if part2:
-                line = replace_number(line)
-            
-            # Extract and process individual digits from the line
-            number = ''
-            for c in line.strip():
-                if c.isdigit():
-                    # Handle multiple numbers (keep only first and last)
-                    if len(number) > 1:
-                        number = number[0] + c
-                    else:
-                        number += c
-            
-            # If only one digit is found, duplicate it to create a two-digit number
-            if len(number) == 1:
-                number *= 2
-            # Convert the processed number to an integer and add it to the list
-            numbers.append(int(number))
-    
+            total += calibration_value(line, automaton)
+
     # Print the sum of numbers
-    print(sum(numbers))
+    print(total)
 
-#day1("day1_input.txt")
+# Streaming mode for very large files: chunks of lines summed in worker processes
 
-# Translation dictionary for word-to-number conversion (extra chars because possible overlap: threeight)
-translate = {
-    'one': '1e',
-    'two': '2o',
-    'three': '3e',
-    'four': '4',
-    'five': '5e',
-    'six': '6',
-    'seven': '7n', 
-    'eight': '8t',
-    'nine': '9e',
-}
+def split_chunks(file, chunk_size: int):
+    """
+    Split a file at line boundaries into chunks of about chunk_size bytes.
 
-def find_number(string: str) -> bool:
+    Parameters:
+    - file (str): The name of the input file.
+    - chunk_size (int): The approximate size of a chunk in bytes.
+
+    Returns:
+    generator: The (start, end) byte offsets of each chunk.
     """
-    Check if a given string contains any of the words from the translation dictionary.
+    input_file = pathlib.Path(file)
+    size = input_file.stat().st_size
+    start = 0
+    with input_file.open('rb') as file:
+        while start < size:
+            # Move the end forward to just after the next line ending
+            file.seek(min(start + chunk_size, size) - 1)
+            file.readline()
+            end = file.tell()
+            yield (start, end)
+            start = end
+
+def sum_chunk(file, start: int, end: int, part2=False, words=None) -> int:
+    """
+    Calculate the sum of the calibration values in a chunk of a file.
 
     Parameters:
-    - string (str): The input string to check.
+    - file (str): The name of the input file.
+    - start (int): The byte offset of the first line of the chunk.
+    - end (int): The byte offset just after the last line of the chunk.
+    - part2 (bool): If True, count words as numbers too.
+    - words (tuple): The (word, number) pairs to use for part 2, None for translate.
 
     Returns:
-    bool: True if any word is found, False otherwise.
+    int: The sum of the calibration values in the chunk.
     """
-    global translate
-    for word in translate.keys():
-        # Check if the word is present in the string
-        if string.find(word) > -1:
-            return True
-    return False
+    automaton = get_automaton(part2, words)
+    total = 0
+    with pathlib.Path(file).open('rb') as file:
+        file.seek(start)
+        position = start
+        for line in file:
+            if position >= end:
+                break
+            position += len(line)
+            total += calibration_value(line.decode(), automaton)
+    return total
 
-def replace_number(string: str) -> str:
+def day1_stream(file, part2=False, words=None, workers=None, chunk_size=64 * 2 ** 20) -> None:
     """
-    Replace words in a string with their corresponding numbers based on the translation dictionary.
+    Calculate the sum of numbers in a (very large) file in chunks, in parallel worker processes, with constant memory.
 
     Parameters:
-    - string (str): The input string to perform replacements on.
+    - file (str): The name of the input file.
+    - part2 (bool): If True, count words as numbers too.
+    - words (dict): Translation dictionary to use for part 2, defaults to translate.
+    - workers (int): The number of worker processes, defaults to the number of CPUs.
+    - chunk_size (int): The approximate size of a chunk in bytes.
 
     Returns:
-    str: The modified string after word-to-number replacements.
-    """
-    global translate
-    part = ''
-    for c in string:
-        part += c
-        # If a word is found, replace it with its corresponding number
-        if find_number(part):
-            for word, number in translate.items():
-                part = part.replace(word, number)
-    return part
-
-# Part 2
-day1("day1_input.txt", True)
\ No newline at end of file
+    None (prints the sum of numbers)
+    """
+    # Only the streaming mode needs worker processes, so import them here
+    from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+
+    workers = workers or os.cpu_count() or 1
+    key = words_key(words)
+    total = 0
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        pending = set()
+        for start, end in split_chunks(file, chunk_size):
+            # Keep a bounded number of chunks in flight, adding results to the running total
+            if len(pending) >= 2 * workers:
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                total += sum(future.result() for future in done)
+            pending.add(executor.submit(sum_chunk, str(file), start, end, part2, key))
+        total += sum(future.result() for future in pending)
+
+    # Print the sum of numbers
+    print(total)
+
+if __name__ == "__main__":
+    day1("day1_input.txt")
+    day1("day1_input.txt", True)
@@ -1,70 +1,41 @@
 """ ADVENT OF CODE 2023 """
 
-import pathlib
 from itertools import combinations
 
-# Day 11
-
-def read_grid(file):
-    """ 
-    Reads grid from a text file.
+from aoc_grid import read_grid
 
-    Args:
-        file (str): The path to the input file.
+# Day 11
 
-    Returns:
-        list: A list representing the grid.
-    """
-    input_file = pathlib.Path(file)
-    grid = []
-    with input_file.open('r') as file:
-        for line in file:
-            row = []
-            for c in line.strip():
-                row.append(c)
-            if line.strip():
-                grid.append(row)
-    return grid
-
-def find_chars(char: chr, grid: list) -> tuple:
+def find_chars(char: chr, grid) -> list:
     """
     Find the coordinates of characters in the grid.
 
     Args:
         char (chr): The character to find.
-        grid (list): The grid.
+        grid (Grid): The grid.
 
     Returns:
-        tuple: A tuple containing the coordinates of characters.
+        list: A list containing the coordinates of characters.
     """
-    x = 0
-    chars = []
-    for row in grid:
-        y = 0
-        for c in row:
-            if c == char:
-                chars.append((x, y))
-            y += 1
-        x += 1
-    return chars
-
-def find_empty_rows_columns(grid:list) -> tuple:
+    return grid.find_all(char)
+
+def find_empty_rows_columns(grid) -> tuple:
     """
     Find empty rows and columns in the grid.
 
     Args:
-        grid (list): The grid.
+        grid (Grid): The grid.
 
     Returns:
         tuple: A tuple containing lists of empty rows and columns.
     """
     galaxies = find_chars('#', grid)
     # get rows and columns with galaxies
-    xs = [tup[0] for tup in galaxies]
-    ys = [tup[1] for tup in galaxies]
+    xs = {tup[0] for tup in galaxies}
+    ys = {tup[1] for tup in galaxies}
     # get dimensions
-    grid_xs = range(len(grid))
-    grid_ys = range(len(grid[0]))
+    grid_xs = range(grid.height)
+    grid_ys = range(grid.width)
     # check rows and columns for galaxies
     empty_rows = [x for x in grid_xs if x not in xs]
     empty_columns = [y for y in grid_ys if y not in ys]
@@ -130,4 +101,6 @@ def day11(file, factor=2):
         total_distance += calculate_distance(pair)
     print(total_distance)
 
-day11("day11_input.txt", 1000000)
+if __name__ == "__main__":
+    day11("day11_input.txt")
+    day11("day11_input.txt", 1000000)
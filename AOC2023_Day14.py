@@ -1,57 +1,34 @@
 """ ADVENT OF CODE 2023 """
 
-import pathlib
 import sys
 
-# Day 14
-
-def read_grid(file):
-    """ 
-    Reads grid from a text file.
-
-    Args:
-        file (str): The path to the input file.
+from aoc_grid import Grid, read_grid
 
-    Returns:
-        list: A list representing the grid.
-    """
-    input_file = pathlib.Path(file)
-    grid = []
-    with input_file.open('r') as file:
-        for line in file:
-            row = []
-            for char in line.strip():
-                row.append(char)
-            if line.strip():
-                grid.append(row)
-    return grid
+# Day 14
 
-def get_column(grid: list, index: int) -> list:
+def get_column(grid: Grid, index: int) -> str:
     """
     Get a column from the grid based on the given index.
 
     Args:
-        grid (list): The input grid.
+        grid (Grid): The input grid.
         index (int): The index of the column.
 
     Returns:
-        list: The column from the grid.
+        str: The column from the grid.
     """
-    col = []
-    for row in grid:
-        col.append(row[index])
-    return col
+    return grid.column(index)
 
-def get_indices_of(char: chr, column: list) -> set:
+def get_indices_of(char: chr, column: str) -> list:
     """
     Get the indices of a character in a column.
 
     Args:
         char (chr): The character to find.
-        column (list): The column to search.
+        column (str): The column to search.
 
     Returns:
-        set: A set containing the indices of the character in the column.
+        list: A list containing the indices of the character in the column.
     """
     indices = []
     for index, spring in enumerate(column):
@@ -108,7 +85,7 @@ def print_grid(grid) -> None:
     Print the grid.
 
     Args:
-        grid (list): The grid to print.
+        grid (Grid): The grid to print.
     """
     print('\n')
     for row in grid:
@@ -117,48 +94,45 @@ def print_grid(grid) -> None:
             print_row += char
         print(print_row)
 
-def apply_gravity(grid: list) -> list:
+def apply_gravity(grid: Grid) -> Grid:
     """
     Apply gravity to the grid.
 
     Args:
-        grid (list): The input grid.
+        grid (Grid): The input grid.
 
     Returns:
-        list: The updated grid after applying gravity.
+        Grid: The updated grid after applying gravity.
     """
-    size = len(grid)
-    # start new grid to return
-    new_grid = [ [] for _ in range(size) ]
+    size = grid.height
+    width = grid.width
+    # start new grid to return, empty space everywhere
+    new_grid = bytearray(b'.' * (size * width))
     # calculate new state for every column and build new grid (to visualize and use for further calculation)
-    for col in range(len(grid[0])):
+    for col in range(width):
         column = get_column(grid, col)
         round_rocks = get_indices_of('O', column)
         cube_rocks = get_indices_of('#', column)
         # calculate new state
         new_state = roll_north(round_rocks, cube_rocks)
         # build new grid
-        for index, row in enumerate(new_grid):
-            if index in new_state:
-                char = 'O'
-            elif index in cube_rocks:
-                char = '#'
-            else:
-                char = '.'
-            row.append(char)
-    return new_grid
+        for index in new_state:
+            new_grid[index * width + col] = ord('O')
+        for index in cube_rocks:
+            new_grid[index * width + col] = ord('#')
+    return Grid(bytes(new_grid), width, size)
 
-def get_score(grid: list) -> int:
+def get_score(grid: Grid) -> int:
     """
     Calculate the score of the grid.
 
     Args:
-        grid (list): The input grid.
+        grid (Grid): The input grid.
 
     Returns:
         int: The score of the grid.
     """
-    size = len(grid)
+    size = grid.height
     totalscore = 0
     for index, row in enumerate(grid):
         totalscore += row.count('O') * (size - index)
@@ -180,34 +154,28 @@ def day14(file):
 
 # Part 2
 
-def rotate_grid(grid: list) -> list:
+def rotate_grid(grid: Grid) -> Grid:
     """
     Rotate the grid clockwise.
 
     Args:
-        grid (list): The input grid.
+        grid (Grid): The input grid.
 
     Returns:
-        list: The rotated grid.
+        Grid: The rotated grid.
     """
-    new_grid = []
-    # rotate clockwise
-    for index in range(len(grid[0])):
-        new_row = []
-        for row in grid:
-            new_row.insert(0, row[index])
-        new_grid.append(new_row)
-    return new_grid
-
-def perform_cycle(grid) -> list:
+    # rotate clockwise: every column read bottom to top becomes a row
+    return Grid.from_rows([grid.column_bytes(index)[::-1] for index in range(grid.width)])
+
+def perform_cycle(grid: Grid) -> Grid:
     """
     Perform one cycle of gravity simulation (north, then west, then south, then east).
 
     Args:
-        grid (list): The input grid.
+        grid (Grid): The input grid.
 
     Returns:
-        list: The grid after one cycle of gravity simulation.
+        Grid: The grid after one cycle of gravity simulation.
     """
     for _ in range(4):
         grid = apply_gravity(grid)
@@ -223,7 +191,7 @@ def day14_2(file):
     """
     # read input
     grid = read_grid(file)
-    start_grid = grid.copy()
+    start_grid = grid
     history = []
     count = 0
     count_started = False
@@ -256,4 +224,6 @@ def day14_2(file):
     # solution
     print(get_score(start_grid))
 
-day14("day14_input.txt")
+if __name__ == "__main__":
+    day14("day14_input.txt")
+    day14_2("day14_input.txt")
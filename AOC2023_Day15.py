@@ -41,8 +41,6 @@ def day15(file):
     # solution
     print(total)
 
-#day15("day15_input.txt")
-
 # Part 2
 
 def split_step(string: str) -> list:
@@ -200,5 +198,7 @@ def day15_2(file):
         total += boxes[box].get_focussing_power()
     # solution
     print(total)
-        
-day15_2("day15_input.txt")
+
+if __name__ == "__main__":
+    day15("day15_input.txt")
+    day15_2("day15_input.txt")
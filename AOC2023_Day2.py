@@ -7,50 +7,131 @@ MAX_RED = 12
 MAX_GREEN = 13
 MAX_BLUE = 14
 
-def day2(file) -> None:
+class GameTable:
     """
-    Calculate and print the sum of IDs for valid games based on color conditions.
+    Class representing all games of a file as columns: the game IDs and the maximum red, green and blue per game.
+
+    The columns are NumPy arrays, so limits and powers are evaluated for all games at once.
+    """
+    def __init__(self, ids, reds, greens, blues) -> None:
+        self.ids = ids
+        self.reds = reds
+        self.greens = greens
+        self.blues = blues
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def possible(self, max_red: int, max_green: int, max_blue: int):
+        """
+        Check which games are possible with a number of cubes of each color.
+
+        Parameters:
+        - max_red (int): The number of red cubes.
+        - max_green (int): The number of green cubes.
+        - max_blue (int): The number of blue cubes.
+
+        Returns:
+        numpy.ndarray: Boolean mask of the possible games.
+        """
+        return (self.reds <= max_red) & (self.greens <= max_green) & (self.blues <= max_blue)
+
+    def possible_sum(self, max_red: int, max_green: int, max_blue: int) -> int:
+        """
+        Calculate the sum of IDs of the games possible with a number of cubes of each color.
+
+        Parameters:
+        - max_red (int): The number of red cubes.
+        - max_green (int): The number of green cubes.
+        - max_blue (int): The number of blue cubes.
+
+        Returns:
+        int: The sum of IDs of the possible games.
+        """
+        return int(self.ids[self.possible(max_red, max_green, max_blue)].sum())
+
+    def possible_sums(self, limits, chunk_size=2 ** 22):
+        """
+        Calculate the sum of IDs of the possible games for many limits at once.
+
+        Parameters:
+        - limits (list): The (red, green, blue) limits, one per query.
+        - chunk_size (int): The number of (query, game) pairs to evaluate at once (bounds the memory of the masks).
+
+        Returns:
+        numpy.ndarray: The sum of IDs of the possible games per query.
+        """
+        import numpy
+
+        limits = numpy.asarray(limits, dtype=numpy.int64).reshape(-1, 3)
+        sums = numpy.zeros(len(limits), dtype=numpy.int64)
+        queries = max(1, chunk_size // max(1, len(self)))
+        for start in range(0, len(limits), queries):
+            chunk = limits[start:start + queries]
+            # one row per query, one column per game
+            possible = self.reds <= chunk[:, 0:1]
+            possible &= self.greens <= chunk[:, 1:2]
+            possible &= self.blues <= chunk[:, 2:3]
+            sums[start:start + len(chunk)] = possible @ self.ids
+        return sums
+
+    def powers(self):
+        """
+        Calculate the power of every game: the product of its maximum red, green and blue.
+
+        Returns:
+        numpy.ndarray: The power per game.
+        """
+        return self.reds * self.greens * self.blues
+
+def read_games(file) -> GameTable:
+    """
+    Parse a file of games once into a table of game IDs and maximum cubes per color.
 
     Parameters:
     - file (str): The name of the input file.
 
     Returns:
-    None (prints the sum of IDs)
+    GameTable: The parsed games.
     """
+    import numpy
+
     input_file = pathlib.Path(file)
-    possibilities = set()
-    
+    columns = {'id': [], 'red': [], 'green': [], 'blue': []}
+
     with input_file.open('r') as file:
         # Iterate through each line in the file
         for line in file:
-            # Split the line into parts using ':'
-            parts = line.split(sep=':')
-            # Extract the game ID from the first part
-            game = parts[0].split()
-            id = int(game[1])
-            # Extract and process individual game sets from the second part
-            game_sets = parts[1].strip().split(sep=';')
-            ok = True
-            # Check color conditions for each color pair in each game set
-            for game_set in game_sets:
-                for color_pair in game_set.split(sep=','):
-                    pair = color_pair.split()
-                    # Check conditions for red color
-                    if pair[1] == 'red' and int(pair[0]) > MAX_RED:
-                        ok = False
-                    # Check conditions for green color
-                    if pair[1] == 'green' and int(pair[0]) > MAX_GREEN:
-                        ok = False
-                    # Check conditions for blue color
-                    if pair[1] == 'blue' and int(pair[0]) > MAX_BLUE:
-                        ok = False
-            # If all conditions are met, add the ID to the set of possibilities
-            if ok:
-                possibilities.update([id])
-    # Print the sum of IDs for valid games
-    print(sum(list(possibilities)))
+            if not line.strip():
+                continue
+            # Split the line into the game and the game sets using ':'
+            game, game_sets = line.split(sep=':')
+            maxima = {'red': 0, 'green': 0, 'blue': 0}
+            # Keep the maximum of each color over all game sets (',' and ';' separate the same way)
+            for color_pair in game_sets.replace(';', ',').split(sep=','):
+                count, color = color_pair.split()
+                count = int(count)
+                if count > maxima[color]:
+                    maxima[color] = count
+            columns['id'].append(int(game.split()[1]))
+            for color, count in maxima.items():
+                columns[color].append(count)
+
+    return GameTable(*(numpy.array(column, dtype=numpy.int64) for column in columns.values()))
+
+def day2(file) -> None:
+    """
+    Calculate and print the sum of IDs for valid games based on color conditions.
+
+    Parameters:
+    - file (str): The name of the input file.
 
-#day2("day2_input.txt")
+    Returns:
+    None (prints the sum of IDs)
+    """
+    games = read_games(file)
+    # Print the sum of IDs for valid games
+    print(games.possible_sum(MAX_RED, MAX_GREEN, MAX_BLUE))
 
 def day2_2(file) -> None:
     """
@@ -62,39 +143,12 @@ def day2_2(file) -> None:
     Returns:
     None (prints the list of products and their sum)
     """
-    input_file = pathlib.Path(file)
-    powers = []
-    
-    with input_file.open('r') as file:
-        # Iterate through each line in the file
-        for line in file:
-            # Split the line into parts using ':'
-            parts = line.split(sep=':')
-            # Extract and process individual game sets from the second part
-            game_sets = parts[1].strip().split(sep=';')
-            max_red = 0
-            max_green = 0
-            max_blue = 0
-            # Find the maximum values for red, green, and blue colors in each game set
-            for game_set in game_sets:
-                for color_pair in game_set.split(sep=','):
-                    pair = color_pair.split()
-                    # Update maximum value for red color
-                    if pair[1] == 'red' and int(pair[0]) > max_red:
-                        max_red = int(pair[0])
-                    # Update maximum value for green color
-                    if pair[1] == 'green' and int(pair[0]) > max_green:
-                        max_green = int(pair[0])
-                    # Update maximum value for blue color
-                    if pair[1] == 'blue' and int(pair[0]) > max_blue:
-                        max_blue = int(pair[0])
-            # Calculate the product of maximum color values (power) and append it to the powers list
-            power = max_blue * max_green * max_red
-            powers.append(power)
-    
+    powers = read_games(file).powers()
+
     # Print the list of products and their sum
-    print(list(powers))
-    print(sum(list(powers)))
+    print(powers.tolist())
+    print(int(powers.sum()))
 
-# Invoke the day2_2 function with the provided input file
-day2_2("day2_input.txt")
+if __name__ == "__main__":
+    day2("day2_input.txt")
+    day2_2("day2_input.txt")
@@ -1,117 +1,50 @@
 """ ADVENT OF CODE 2023 """
-import pathlib
+import re
+from array import array
 
-def read_grid(file):
-    """Reads a grid from a text file.
+from aoc_grid import read_grid
 
-    Args:
-        file (str): The name of the input file.
-
-    Returns:
-        list: A 2D grid read from the file.
-    """
-    input_path = pathlib.Path(file)
-    grid = []
-
-    # Open the file and read each line
-    with input_path.open('r') as file:
-        for line in file:
-            row = []
-            # Iterate through characters in the line and append them to the row
-            for c in line.strip():
-                row.append(c)
-            grid.append(row)
-    
-    return grid
-
-def add_pos(pos1: tuple, pos2: tuple) -> tuple:
-    """Adds two positions element-wise.
-
-    Args:
-        pos1 (tuple): The first position.
-        pos2 (tuple): The second position.
-
-    Returns:
-        tuple: The result of the addition.
-    """
-    return (pos1[0] + pos2[0], pos1[1] + pos2[1])
-
-def get_adjacent(pos: tuple) -> list:
-    """Gets a list of adjacent positions to a given position.
-
-    Args:
-        pos (tuple): The position for which to find adjacent positions.
-
-    Returns:
-        list: List of adjacent positions.
-    """
-    steps = [(1, 0), (0, 1), (-1, 0), (0, -1), (1, 1), (-1, -1), (1, -1), (-1, 1)]
-    return [add_pos(pos, step) for step in steps]
-
-def get_adjacent_in_grid(pos, grid) -> list:
-    """Gets a list of adjacent positions within the grid boundaries.
+# Numbers are runs of digits, symbols are all characters except digits and '.'
+NUMBER = re.compile(rb'\d+')
+SYMBOL = re.compile(rb'[^\d.]')
 
-    Args:
-        pos (tuple): The position for which to find adjacent positions.
-        grid (list): The 2D grid.
-
-    Returns:
-        list: List of adjacent positions within the grid boundaries.
-    """
-    max_x = len(grid)
-    max_y = len(grid[0])
-    return [pos for pos in get_adjacent(pos) if 0 <= pos[0] < max_x and 0 <= pos[1] < max_y]
-
-def get_char_from_grid(pos, grid) -> chr:
-    """Gets the character at a given position in the grid.
+def index_numbers(grid) -> list:
+    """Labels every number in the grid once with its span and value.
 
     Args:
-        pos (tuple): The position in the grid.
-        grid (list): The 2D grid.
+        grid (Grid): The 2D grid.
 
     Returns:
-        chr: The character at the specified position, None if out of boundaries
+        list: List of numbers as tuples (row, first column, column after the last digit, value), row by row.
     """
-    x = pos[0]
-    y = pos[1]
-    max_x = len(grid)
-    max_y = len(grid[0])
-    
-    # Check if the position is within the grid boundaries
-    if x >= max_x or y >= max_y:
-        return None
-    
-    return grid[x][y]
+    numbers = []
+    for x in range(grid.height):
+        for match in NUMBER.finditer(grid.row_bytes(x)):
+            numbers.append((x, match.start(), match.end(), int(match.group())))
+    return numbers
 
-def char_is_symbol(char: chr) -> bool:
-    """Checks if a character is a symbol.
+def symbol_mask(grid) -> bytearray:
+    """Marks every position that is a symbol or adjacent to one.
 
     Args:
-        char (chr): The character to check.
+        grid (Grid): The 2D grid.
 
     Returns:
-        bool: True if the character is a symbol, False otherwise.
+        bytearray: One byte per position (row by row), 1 if next to a symbol, 0 otherwise.
     """
-    if char.isdigit() or char == '.':
-        return False
-    return True
-
-def is_adjacent_to_symbol(pos, grid) -> bool:
-    """Checks if any adjacent position contains a symbol.
-
-    Args:
-        pos (tuple): The position to check for adjacency.
-        grid (list): The 2D grid.
-
-    Returns:
-        bool: True if any adjacent position contains a symbol, False otherwise.
-    """
-    # loop trough adjacent positions to find symbol
-    for position in get_adjacent_in_grid(pos, grid):
-        char = get_char_from_grid(position, grid)
-        if char_is_symbol(char):
-            return True
-    return False
+    max_x = grid.height
+    max_y = grid.width
+    mask = bytearray(max_x * max_y)
+    for x in range(max_x):
+        for match in SYMBOL.finditer(grid.row_bytes(x)):
+            y = match.start()
+            # mark the 3x3 block around the symbol, clipped to the grid
+            first_y = max(y - 1, 0)
+            last_y = min(y + 2, max_y)
+            for adjacent_x in range(max(x - 1, 0), min(x + 2, max_x)):
+                start = adjacent_x * max_y
+                mask[start + first_y:start + last_y] = b'\x01' * (last_y - first_y)
+    return mask
 
 def day3(file):
     """Calculate and print the sum of numbers found adjacent to symbols in the grid.
@@ -120,111 +53,59 @@ def day3(file):
         file (str): The name of the input file.
     """
     grid = read_grid(file)
-    max_x = len(grid)
-    max_y = len(grid[0])
-    x = 0
-    y = 0
-    number = ''
-    found_adjacent = False
+    max_y = grid.width
+    mask = symbol_mask(grid)
     part_numbers = []
-    
-    # Loop through each position in the grid
-    while x < max_x:
-        while y < max_y:
-            char = get_char_from_grid((x, y), grid)
-            
-            # If the character is a digit, add it to the number
-            if char.isdigit():
-                number += char
-                # If the position is adjacent to a symbol, set found_adjacent to True
-                if is_adjacent_to_symbol((x, y), grid):
-                    found_adjacent = True
-            # If number is not empty, check if it's adjacent to a symbol and add to part_numbers
-            elif number:
-                if found_adjacent:
-                    part_numbers.append(int(number))
-                number = ''
-                found_adjacent = False
-            y += 1
-        # If found_adjacent is True at the end of a row, add the number to part_numbers
-        if found_adjacent:
-            part_numbers.append(int(number))
-        number = ''
-        found_adjacent = False       
-        y = 0
-        x += 1
+
+    # A number is a part number if any of its digits is next to a symbol
+    for x, start, end, value in index_numbers(grid):
+        if 1 in mask[x * max_y + start:x * max_y + end]:
+            part_numbers.append(value)
     # Print the sum of part_numbers
     print(sum(part_numbers))
 
-day3("day3_input.txt")
-
 # Part 2
 
-def char_is_gear(char: chr) -> bool:
-    """Checks if a character is a gear symbol.
+GEAR = '*'
 
-    Args:
-        char (chr): The character to check.
-
-    Returns:
-        bool: True if the character is a gear symbol, False otherwise.
-    """
-    return char == '*'
-
-def get_whole_number(pos, grid) -> int:
-    """Gets the whole number associated with a position in the grid.
+def number_ids(grid, numbers: list) -> array:
+    """Maps every position to the number it is part of.
 
     Args:
-        pos (tuple): The position in the grid.
-        grid (list): The 2D grid.
+        grid (Grid): The 2D grid.
+        numbers (list): The numbers in the grid (see index_numbers).
 
     Returns:
-        int: The whole number, or -1 if not found.
+        array: One id per position (row by row), the index of the number in numbers or -1 if not part of a number.
     """
-    if not get_char_from_grid(pos, grid).isdigit():
-        return -1
-    x = pos[0]
-    y = pos[1] - 1
-    char = get_char_from_grid((x, y), grid)
-    
-    # Find the first digit of the number the digit on pos is part of
-    while char.isdigit():
-        y -= 1
-        char = get_char_from_grid((x, y), grid)
-    
-    first_digit_y = y + 1
-    number = ''
-    char = get_char_from_grid((x, first_digit_y), grid)
-    y = first_digit_y
-    
-    # Get the whole number starting from the first digit
-    while char and char.isdigit():
-        number += char
-        y += 1
-        char = get_char_from_grid((x, y), grid)
-    
-    return int(number)
+    max_y = grid.width
+    # 4 bytes per position: numbers are apart, so a grid below 2**32 positions holds less than 2**31 of them
+    ids = array('i', [-1]) * (grid.height * max_y)
+    for number_id, (x, start, end, _) in enumerate(numbers):
+        ids[x * max_y + start:x * max_y + end] = array('i', [number_id]) * (end - start)
+    return ids
 
-def get_adjacent_whole_numbers(pos, grid) -> list:
-    """Gets a list of adjacent whole numbers to a position in the grid.
+def get_adjacent_number_ids(pos: tuple, ids: array, max_x: int, max_y: int) -> set:
+    """Gets the distinct numbers adjacent to a position in the grid.
 
     Args:
-        pos (tuple): The position for which to find adjacent whole numbers.
-        grid (list): The 2D grid.
+        pos (tuple): The position for which to find adjacent numbers.
+        ids (array): The number id per position (see number_ids).
+        max_x (int): The number of rows in the grid.
+        max_y (int): The number of columns in the grid.
 
     Returns:
-        list: List of adjacent whole numbers.
+        set: The ids of the adjacent numbers.
     """
-    # use set to get unique numbers
-    whole_numbers = set()
-    adjacents = get_adjacent_in_grid(pos, grid)
-    # loop trough adjecent positions to find whole numbers
-    for adjacent in adjacents:
-        number = get_whole_number(adjacent, grid)
-        # if number found, add it to whole_numbers
-        if number > 0:
-            whole_numbers.update([number])
-    return list(whole_numbers)
+    x, y = pos
+    first_y = max(y - 1, 0)
+    last_y = min(y + 2, max_y)
+    adjacent_ids = set()
+    for adjacent_x in range(max(x - 1, 0), min(x + 2, max_x)):
+        start = adjacent_x * max_y
+        adjacent_ids.update(ids[start + first_y:start + last_y])
+    adjacent_ids.discard(-1)
+    return adjacent_ids
 
 def day3_2(file):
     """Calculate and print the sum of gear ratios in the grid.
@@ -233,27 +114,19 @@ def day3_2(file):
         file (str): The name of the input file.
     """
     grid = read_grid(file)
-    max_x = len(grid)
-    max_y = len(grid[0])
-    x = 0
-    y = 0
+    numbers = index_numbers(grid)
+    ids = number_ids(grid, numbers)
     gear_ratios = []
-    
-    # Loop through each position in the grid
-    while x < max_x:
-        while y < max_y:
-            char = get_char_from_grid((x, y), grid)
-            
-            # If the character is a gear symbol, get adjacent whole numbers and calculate gear ratio
-            if char_is_gear(char):
-                whole_numbers = get_adjacent_whole_numbers((x, y), grid)
-                if len(whole_numbers) > 1:
-                    gear_ratio = whole_numbers[0] * whole_numbers[1]
-                    gear_ratios.append(gear_ratio)
-            y += 1
-        y = 0
-        x += 1
+
+    # A gear is a gear symbol adjacent to exactly two (different) numbers
+    for pos in grid.find_all(GEAR):
+        adjacent_ids = get_adjacent_number_ids(pos, ids, grid.height, grid.width)
+        if len(adjacent_ids) == 2:
+            first_id, second_id = adjacent_ids
+            gear_ratios.append(numbers[first_id][3] * numbers[second_id][3])
     # Print the sum of gear_ratios
     print(sum(gear_ratios))
 
-day3_2("day3_input.txt")
+if __name__ == "__main__":
+    day3("day3_input.txt")
+    day3_2("day3_input.txt")
@@ -1,21 +1,70 @@
 """ ADVENT OF CODE 2023 """
 import pathlib
+import re
 
 # Day 4
 
-def calculate_points(len_matches: int) -> int:
-    """Calculate points based on the length of matching numbers.
+# Bytes that are part of a number, everything else ('Card', ':', '|') becomes a space
+NUMBER_BYTES = bytes(c if chr(c) in "0123456789\n" else ord(" ") for c in range(256))
+
+def read_cards(file) -> tuple:
+    """Read the cards of the lottery game into two matrices of numbers, one row per card.
+
+    Args:
+        file (str): The name of the input file.
+
+    Returns:
+        tuple: The winning numbers and the lottery numbers (numpy.ndarray, every card has as many numbers).
+    """
+    import numpy
+
+    data = pathlib.Path(file).read_bytes()
+    first_card = re.search(rb"\S[^\n]*", data)
+    if not first_card:
+        empty = numpy.zeros((0, 0), dtype=numpy.int64)
+        return (empty, empty)
+    width_winning = len(first_card.group().partition(b":")[2].split(b"|")[0].split())
+
+    # Blank out all but the numbers in one pass and parse them in one go, the card number is the first of each row
+    numbers = numpy.fromstring(data.translate(NUMBER_BYTES).decode("ascii"), dtype=numpy.int64, sep=" ")
+    numbers = numbers.reshape(data.count(b":"), -1)[:, 1:]
+    return (numbers[:, :width_winning], numbers[:, width_winning:])
+
+def count_matches(winning_numbers, lottery_numbers):
+    """Count the lottery numbers that are winning numbers, for all cards at once.
+
+    The winning numbers of every card become a row of booleans over the domain of the numbers (a bitset),
+    all lottery numbers are looked up in their row in one go and the hits are counted.
+
+    Args:
+        winning_numbers (numpy.ndarray): The winning numbers, one row per card.
+        lottery_numbers (numpy.ndarray): The lottery numbers, one row per card.
+
+    Returns:
+        numpy.ndarray: The number of matches per card.
+    """
+    import numpy
+
+    cards = len(winning_numbers)
+    if not cards:
+        return numpy.zeros(0, dtype=numpy.int64)
+    domain = int(max(winning_numbers.max(initial=0), lottery_numbers.max(initial=0))) + 1
+    # offset of the row of each card in the flat bitset
+    offsets = numpy.arange(cards, dtype=numpy.int64)[:, None] * domain
+    winning = numpy.zeros(cards * domain, dtype=bool)
+    winning[(winning_numbers + offsets).ravel()] = True
+    return numpy.count_nonzero(winning[lottery_numbers + offsets], axis=1)
+
+def read_matches(file):
+    """Read the cards of the lottery game and count the matches of each card once.
 
     Args:
-        len_matches (int): The length of matching numbers.
+        file (str): The name of the input file.
 
     Returns:
-        int: The calculated points.
+        numpy.ndarray: The number of matches per card.
     """
-    if not len_matches:
-        return 0
-    power = len_matches - 1
-    return 2 ** power
+    return count_matches(*read_cards(file))
 
 def day4(file):
     """Calculate and print the total points for the lottery game.
@@ -23,88 +72,42 @@ def day4(file):
     Args:
         file (str): The name of the input file.
     """
-    total_points = 0
-    input_file = pathlib.Path(file)
-
-    # Open the file and read each line
-    with input_file.open('r') as file:
-        for line in file:
-            # Split the line into parts
-            parts = line.strip().split(":")
-            numbers = parts[1]
-            
-            # Split the numbers into winning and lottery numbers
-            split_numbers = numbers.split("|")
-            winning_numbers = split_numbers[0].split()
-            lottery_numbers = split_numbers[1].split()
-            
-            # Find the matches between winning and lottery numbers
-            matches = [num for num in lottery_numbers if num in winning_numbers]
-            
-            # Calculate points based on the number of matches and update total_points
-            points = calculate_points(len(matches))
-            total_points += points
+    matches = read_matches(file)
+
+    # Calculate points based on the number of matches of each card: 2 ** (matches - 1), 0 without matches
+    points = (1 << matches) >> 1
+    total_points = int(points.sum())
     
     print(total_points)
 
-# day4("day4_input.txt")
-
 # Part 2
 
-def add_copy_of_cards(card: int, copies_of_cards: dict):
-    """Add a copy of a card to the copies_of_cards dictionary.
-
-    Args:
-        card (int): The card number.
-        copies_of_cards (dict): Dictionary to store the number of copies for each card.
-    """
-    if card not in copies_of_cards.keys():
-        copies_of_cards[card] = 1
-    else: 
-        copies_of_cards[card] += 1 
-
 def day4_2(file):
     """Calculate and print the total number of copies of cards for the lottery game.
 
     Args:
         file (str): The name of the input file.
     """
-    copies_of_cards = dict()
-    input_file = pathlib.Path(file)
-    # current card to score
-    card = 1
-
-    # Open the file and read each line
-    with input_file.open('r') as file:
-        for line in file:
-            # Add a copy of the current card to the dictionary
-            add_copy_of_cards(card, copies_of_cards)
-            
-            # Loop through the copies of the current card
-            for _ in range(copies_of_cards[card]):
-                # Split the line into parts
-                parts = line.strip().split(":")
-                numbers = parts[1]
-                
-                # Split the numbers into winning and lottery numbers
-                split_numbers = numbers.split("|")
-                winning_numbers = split_numbers[0].split()
-                lottery_numbers = split_numbers[1].split()
-                
-                # Find the matches between winning and lottery numbers
-                matches = [num for num in lottery_numbers if num in winning_numbers]
-                
-                # add a copy for each match to following cards
-                add_card = card
-                for _ in matches:
-                    add_card += 1
-                    add_copy_of_cards(add_card, copies_of_cards)
-            
-            # Move to the next card
-            card += 1
-    
-    # Print the sum of values in copies_of_cards
-    print(sum(copies_of_cards.values()))
+    matches_of_cards = read_matches(file).tolist()
+    number_of_cards = len(matches_of_cards)
+    # difference array: copies won for a range of cards are added at its start and removed after its end
+    won_copies = [0] * (number_of_cards + 1)
+    copies = 0
+    total_copies = 0
+
+    for card, matches in enumerate(matches_of_cards):
+        # copies of this card: the original plus the copies won from previous cards
+        copies += won_copies[card]
+        copies_of_card = copies + 1
+        total_copies += copies_of_card
+        # every copy of this card wins a copy of each of the next cards (as many as matches)
+        if matches:
+            won_copies[card + 1] += copies_of_card
+            won_copies[min(card + matches, number_of_cards - 1) + 1] -= copies_of_card
+
+    # Print the total number of copies
+    print(total_copies)
 
-# solution 
-day4_2("day4_input.txt")
+if __name__ == "__main__":
+    day4("day4_input.txt")
+    day4_2("day4_input.txt")
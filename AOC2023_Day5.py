@@ -1,34 +1,302 @@
 """ ADVENT OF CODE 2023 """
+import heapq
+import math
 import pathlib
+from bisect import bisect_right
 
-def from_source_to_destination(seed_maps: list, source: int) -> int:
+class SeedMap:
     """
-    Calculates the destination based on a list of seed maps and a source value.
+    Class representing an almanac section compiled into a piecewise-linear map.
+
+    The numbers from 0 up are cut into consecutive segments: segment i starts at starts[i], ends where the next
+    segment starts (the last one never ends) and moves its numbers by offsets[i] (0 for numbers not in the section).
+    """
+    def __init__(self, starts: list, offsets: list) -> None:
+        self.starts = starts
+        self.offsets = offsets
+        self._arrays = None
+
+    @classmethod
+    def from_entries(cls, entries: list) -> 'SeedMap':
+        """
+        Compile the entries of an almanac section.
+
+        Parameters:
+        - entries: List of seed maps, each represented as a list [destination, source, length].
+
+        Returns:
+        - SeedMap: The compiled map.
+        """
+        starts = []
+        offsets = []
+        position = 0
+        for destination, source, length in sorted(entries, key=lambda entry: entry[1]):
+            if length <= 0:
+                continue
+            if source < position:
+                raise ValueError(f"overlapping source ranges in seed map at {source}")
+            # numbers between entries map to themselves
+            if source > position:
+                starts.append(position)
+                offsets.append(0)
+            starts.append(source)
+            offsets.append(destination - source)
+            position = source + length
+        starts.append(position)
+        offsets.append(0)
+        return cls(*merge_segments(starts, offsets))
+
+    def __call__(self, source: int) -> int:
+        """
+        Calculates the destination of a source value.
+
+        Parameters:
+        - source: The source value (not negative).
+
+        Returns:
+        - int: The destination value.
+        """
+        return source + self.offsets[bisect_right(self.starts, source) - 1]
+
+    def __len__(self) -> int:
+        return len(self.starts)
+
+    def segments(self):
+        """
+        Iterate over the segments of the map.
+
+        Returns:
+        - generator: The segments as tuples (start, end, offset), the end of the last segment is math.inf.
+        """
+        ends = self.starts[1:] + [math.inf]
+        return zip(self.starts, ends, self.offsets)
+
+    def then(self, other: 'SeedMap') -> 'SeedMap':
+        """
+        Composes this map with a next one: the result maps a source in one step as other(self(source)).
+
+        Parameters:
+        - other: The map to apply after this one.
+
+        Returns:
+        - SeedMap: The composed map.
+        """
+        starts = []
+        offsets = []
+        for start, end, offset in self.segments():
+            # cut the image of the segment where the segments of the next map start
+            index = bisect_right(other.starts, start + offset) - 1
+            while index < len(other.starts) and other.starts[index] < end + offset:
+                starts.append(max(start, other.starts[index] - offset))
+                offsets.append(offset + other.offsets[index])
+                index += 1
+        return SeedMap(*merge_segments(starts, offsets))
+
+    def inverse(self) -> 'InverseSeedMap':
+        """
+        Inverts the map, to find the sources of destinations.
+
+        Returns:
+        - InverseSeedMap: The inverted map.
+        """
+        return InverseSeedMap(sorted((start + offset, end + offset, offset) for start, end, offset in self.segments()))
+
+    def map_many(self, sources):
+        """
+        Calculates the destinations of an array of source values at once.
+
+        Parameters:
+        - sources: The source values (not negative).
+
+        Returns:
+        - numpy.ndarray: The destination values.
+        """
+        import numpy
+
+        if self._arrays is None:
+            self._arrays = (numpy.array(self.starts, dtype=numpy.int64), numpy.array(self.offsets, dtype=numpy.int64))
+        starts, offsets = self._arrays
+        sources = numpy.asarray(sources, dtype=numpy.int64)
+        return sources + offsets[numpy.searchsorted(starts, sources, side='right') - 1]
+
+class InverseSeedMap:
+    """
+    Class representing the inverse of a SeedMap, indexed by destination.
+
+    Images of different segments may overlap, so a destination can have more than one source. The destinations are
+    cut at every start and end of an image; for each piece the offsets of the segments covering it are kept.
+    """
+    def __init__(self, segments: list) -> None:
+        self.segments = segments
+        events = {}
+        for image_start, image_end, offset in segments:
+            events.setdefault(image_start, []).append((1, offset))
+            if image_end != math.inf:
+                events.setdefault(image_end, []).append((-1, offset))
+        # sweep over the boundaries, keeping the offsets of the images covering each piece
+        self.bounds = sorted(events)
+        self.covering = []
+        active = set()
+        for bound in self.bounds:
+            for change, offset in events[bound]:
+                if change < 0:
+                    active.discard(offset)
+            for change, offset in events[bound]:
+                if change > 0:
+                    active.add(offset)
+            self.covering.append(tuple(active))
+
+    def preimage(self, start: int, end: int):
+        """
+        Finds the sources of a range of destinations, visiting only the images that overlap it.
+
+        Parameters:
+        - start: The start of the range.
+        - end: The end of the range (not included).
+
+        Returns:
+        - generator: The source ranges as tuples (start, end, offset), where offset leads back to the destination.
+        """
+        index = max(bisect_right(self.bounds, start) - 1, 0)
+        while index < len(self.bounds) and self.bounds[index] < end:
+            piece_start = max(start, self.bounds[index])
+            piece_end = min(end, self.bounds[index + 1] if index + 1 < len(self.bounds) else math.inf)
+            if piece_start < piece_end:
+                for offset in self.covering[index]:
+                    yield (piece_start - offset, piece_end - offset, offset)
+            index += 1
+
+def merge_segments(starts: list, offsets: list) -> tuple:
+    """
+    Merges neighbouring segments of a map that move numbers by the same offset.
+
+    Parameters:
+    - starts: The starts of the segments (ascending).
+    - offsets: The offset of each segment.
+
+    Returns:
+    - tuple: The starts and offsets of the merged segments.
+    """
+    merged_starts = []
+    merged_offsets = []
+    for start, offset in zip(starts, offsets):
+        # an empty segment is replaced by the next one starting at the same number
+        if merged_starts and merged_starts[-1] == start:
+            merged_starts.pop()
+            merged_offsets.pop()
+        if merged_offsets and merged_offsets[-1] == offset:
+            continue
+        merged_starts.append(start)
+        merged_offsets.append(offset)
+    return (merged_starts, merged_offsets)
+
+def compose_maps(seed_maps: list) -> SeedMap:
+    """
+    Composes the maps of all stages into one map, from seed to location.
 
     Parameters:
-    - seed_maps: List of seed maps, each represented as a tuple (delta, start, length).
-    - source: The source value.
+    - seed_maps: The maps of the stages in order.
 
     Returns:
-    - int: The calculated destination value.
+    - SeedMap: The composed map.
     """
+    composed = SeedMap([0], [0])
     for seed_map in seed_maps:
-        if seed_map[1] <= source < seed_map[1] + seed_map[2]:
-            delta = seed_map[0] - seed_map[1]
-            return source + delta
-    return source 
+        composed = composed.then(seed_map)
+    return composed
 
-# Main function for Day 5, Part 1
-def day5(file):
+class Almanac:
     """
-    Solves Day 5, Part 1 of Advent of Code 2023.
+    Class representing the maps of all stages of an almanac, from seed to location.
+
+    A single query goes through the stages one by one. As soon as the almanac is queried again, the stages are
+    composed into one map (once, cached), so every later query is a single lookup.
+    """
+    def __init__(self, seed_maps: list) -> None:
+        self.seed_maps = seed_maps
+        self.queries = 0
+        self.composed = None
+
+    @classmethod
+    def from_sections(cls, sections: list) -> 'Almanac':
+        """
+        Compiles the sections of an almanac.
+
+        Parameters:
+        - sections: The sections, each a list of entries [destination, source, length].
+
+        Returns:
+        - Almanac: The almanac.
+        """
+        return cls([SeedMap.from_entries(section) for section in sections])
+
+    def seed_to_location(self) -> SeedMap:
+        """
+        Gets the composed map from seed to location, composed when first needed.
+
+        Returns:
+        - SeedMap: The composed map.
+        """
+        if self.composed is None:
+            self.composed = compose_maps(self.seed_maps)
+        return self.composed
+
+    def stages(self) -> list:
+        """
+        Gets the maps to apply for a query: the stages the first time, the composed map from the second query on.
+
+        Returns:
+        - list: The maps to apply in order.
+        """
+        self.queries += 1
+        if self.composed is None and self.queries > 1:
+            self.seed_to_location()
+        return [self.composed] if self.composed is not None else self.seed_maps
+
+    def locations(self, seeds: list) -> list:
+        """
+        Calculates the locations of seeds.
+
+        Parameters:
+        - seeds: The seeds.
+
+        Returns:
+        - list: The location of each seed.
+        """
+        seed_maps = self.stages()
+        locations = []
+        for seed in seeds:
+            for seed_map in seed_maps:
+                seed = seed_map(seed)
+            locations.append(seed)
+        return locations
+
+    def translate(self, seed_ranges: 'IntervalSet') -> 'IntervalSet':
+        """
+        Calculates the locations of ranges of seeds.
+
+        Parameters:
+        - seed_ranges: The seeds.
+
+        Returns:
+        - IntervalSet: The locations.
+        """
+        for seed_map in self.stages():
+            seed_ranges = seed_ranges.translate(seed_map)
+        return seed_ranges
+
+def read_almanac(file) -> tuple:
+    """
+    Reads the seeds and the sections of seed maps from an almanac.
 
     Parameters:
     - file: Input file containing seed information.
+
+    Returns:
+    - tuple: The seeds (list of int) and the sections (list of lists [destination, source, length]).
     """
     # Read input file
     input_file = pathlib.Path(file)
-    seed_maps = dict()
     with input_file.open('r') as file:
         lines = file.readlines()
 
@@ -36,29 +304,33 @@ def day5(file):
     seeds = list(map(int, lines[0].strip().split(":")[1].split()))
 
     # Collect seed_maps
-    map_lines = lines[2:]
-    for line in map_lines:
+    sections = []
+    for line in lines[2:]:
         line_parts = line.strip().split()
         if not line_parts:
-            seed_maps[key] = values
+            continue
         elif not line_parts[0].isdigit():
-            key = line_parts[0]
-            values = []
+            sections.append([])
         else:
-            values.append(list(map(int, line_parts)))
-    seed_maps[key] = values
-
-    # Loop through seeds and apply translations
-    locations = []
-    for seed in seeds:
-        for seed_map in seed_maps.values():
-            seed = from_source_to_destination(seed_map, seed)
-        locations.append(seed)
+            sections[-1].append(list(map(int, line_parts)))
+    return (seeds, sections)
+
+# Main function for Day 5, Part 1
+def day5(file):
+    """
+    Solves Day 5, Part 1 of Advent of Code 2023.
+
+    Parameters:
+    - file: Input file containing seed information.
+    """
+    seeds, sections = read_almanac(file)
+    almanac = Almanac.from_sections(sections)
+
+    # Loop through seeds and apply the translations
+    locations = almanac.locations(seeds)
     # print solution
     print(min(locations))
 
-day5("day5_input.txt")
-
 # Part 2
 
 def get_seeds(seeds: list) -> list:
@@ -80,18 +352,6 @@ def get_seeds(seeds: list) -> list:
         cursor += 2
     return list(new_seeds)
 
-def map_to_range(seed_map: list) -> tuple:
-    """
-    Extracts the range from a seed map.
-
-    Parameters:
-    - seed_map: Seed map represented as a list [delta, start, length].
-
-    Returns:
-    - tuple: Range as a tuple (start, end).
-    """
-    return (seed_map[1], seed_map[1] + seed_map[2])
-
 def overlap(range1: tuple, range2: tuple) -> tuple:
     """
     Finds the overlap between two ranges.
@@ -110,129 +370,142 @@ def overlap(range1: tuple, range2: tuple) -> tuple:
         return None
     return (overlap_start, overlap_end)
 
-def minus(range1: tuple, range2: tuple) -> list:
+class IntervalSet:
     """
-    Subtracts one range from another.
-
-    Parameters:
-    - range1: First range as a tuple (start, end).
-    - range2: Second range as a tuple (start, end).
-
-    Returns:
-    - list: List of remaining ranges after subtraction.
-    """
-    # if equal return empty list
-    if range1 == range2:
-        return []
-    # if range2 is subset of range1: possible 2 results (smaller and bigger values)
-    elif overlap(range1, range2) == range2:
-        retval = []
-        if range1[0] != range2[0]:
-            left_smaller = (range1[0], range2[0])
-            retval.append(left_smaller)
-        if range2[1] != range1[1]:
-            left_bigger = (range2[1], range1[1])
-            retval.append(left_bigger)
-        return retval
-    # overlap downside
-    elif range1[0] < range2[1] < range1[1]:
-        return [(range2[1], range1[1])]
-    # overlap upperside
-    elif range1[0] < range2[0] < range1[1]:
-        return [(range1[0], range2[0])]
-    # no overlap, return just range1
-    else: 
-        return [range1]
-
-def range_in_map(seed_range: tuple, seed_map: list) -> tuple:
-    """
-    Checks if seed range has overlap with seed map.
+    Class representing a set of numbers as sorted, disjoint ranges (start, end), end not included.
 
-    Parameters:
-    - seed_range: Range as a tuple (start, end).
-    - seed_map: Seed map represented as a list [delta, start, length].
-
-    Returns:
-    - tuple: Overlapping range as a tuple (start, end) or None if no overlap.
+    Ranges that overlap or touch are coalesced, so the number of ranges stays as small as possible.
     """
-    return overlap(seed_range, map_to_range(seed_map))
+    def __init__(self, ranges=()) -> None:
+        self.ranges = []
+        # sort by start and merge every range that overlaps or touches the previous one
+        for start, end in sorted(ranges):
+            if start >= end:
+                continue
+            if self.ranges and start <= self.ranges[-1][1]:
+                if end > self.ranges[-1][1]:
+                    self.ranges[-1] = (self.ranges[-1][0], end)
+            else:
+                self.ranges.append((start, end))
+
+    def __iter__(self):
+        return iter(self.ranges)
+
+    def __len__(self) -> int:
+        return len(self.ranges)
+
+    def __eq__(self, other) -> bool:
+        if not isinstance(other, IntervalSet):
+            return NotImplemented
+        return self.ranges == other.ranges
+
+    def min(self) -> int:
+        """
+        Gets the smallest number in the set.
+
+        Returns:
+        - int: The smallest number, None if the set is empty.
+        """
+        return self.ranges[0][0] if self.ranges else None
+
+    def lowest_in(self, start: int, end: int) -> int:
+        """
+        Gets the smallest number in the set within a range.
+
+        Parameters:
+        - start: The start of the range.
+        - end: The end of the range (not included).
+
+        Returns:
+        - int: The smallest number in the set and the range, None if there is none.
+        """
+        index = bisect_right(self.ranges, (start, math.inf)) - 1
+        # the range starting at or before start may still contain it
+        if index >= 0 and overlap(self.ranges[index], (start, end)):
+            return start
+        if index + 1 < len(self.ranges) and self.ranges[index + 1][0] < end:
+            return self.ranges[index + 1][0]
+        return None
 
-def from_source_to_destination_range(seed_maps: list, source_ranges: list) -> list:
+    def translate(self, seed_map: SeedMap) -> 'IntervalSet':
+        """
+        Applies a map to every number in the set, in one merge pass over the ranges and the segments of the map.
+
+        Parameters:
+        - seed_map: The map to apply.
+
+        Returns:
+        - IntervalSet: The set of destinations.
+        """
+        starts = seed_map.starts
+        offsets = seed_map.offsets
+        destination_ranges = []
+        index = 0
+        for start, end in self.ranges:
+            # move to the segment containing the start (ranges are sorted, so never back)
+            while index + 1 < len(starts) and starts[index + 1] <= start:
+                index += 1
+            # translate the part of the range in each segment it covers
+            while True:
+                segment_end = starts[index + 1] if index + 1 < len(starts) else math.inf
+                destination_ranges.append((max(start, starts[index]) + offsets[index],
+                                           min(end, segment_end) + offsets[index]))
+                if segment_end >= end:
+                    break
+                index += 1
+        return IntervalSet(destination_ranges)
+
+def lowest_location(seed_ranges: IntervalSet, seed_maps: list) -> int:
     """
-    Applies translations to a range of seeds using a list of seed maps.
+    Finds the lowest location of any seed by searching back from the locations, lowest first.
+
+    Ranges are followed back through the inverted stages one at a time, always continuing with the range that could
+    still lead to the lowest location. The search stops as soon as the lowest candidate is an actual seed.
 
     Parameters:
-    - seed_maps: List of seed maps, each represented as a list [delta, start, length].
-    - source_ranges: List of seed ranges as tuples.
+    - seed_ranges: The seeds.
+    - seed_maps: The maps of the stages in order.
 
     Returns:
-    - list: List of destination ranges after applying translations.
-    """
-    destination_ranges = []
-    # working list of source ranges
-    while source_ranges:
-        # take first of working list to apply translation
-        source_range = source_ranges.pop(0)
-        # keep track of matches, if not seed range just falls trough to next map (add whole range to destination ranges)
-        no_matches = True
-        # loop trough seed map translation ranges
-        for seed_map in seed_maps:
-            # check overlap with translation range
-            in_map = range_in_map(source_range, seed_map)
-            # if overlap, translate and add to destinations list
-            if in_map:
-                no_matches = False
-                delta = seed_map[0] - seed_map[1]
-                destination_ranges.append((in_map[0] + delta, in_map[1] + delta))
-                # check whether there are ranges left to translate further
-                leftover = minus(source_range, in_map)
-                # if ranges left add to working list 
-                if leftover:
-                    source_ranges.extend(leftover)
-                # stop this cycle (leftover added to working list)
-                break
-        # keep track of matches, if not seed range just falls trough to next map (add whole range to destination ranges)
-        if no_matches:
-            destination_ranges.append(source_range)            
-    return destination_ranges
-
-def day5_2(file):
+    - int: The lowest location, None if there are no seeds.
+    """
+    inverses = [seed_map.inverse() for seed_map in seed_maps]
+    # (lowest possible location, 0 for a found seed or 1 for a range, stage, start, end, offset back to the location)
+    queue = [(0, 1, len(inverses), 0, math.inf, 0)]
+    while queue:
+        location, is_range, stage, start, end, shift = heapq.heappop(queue)
+        if not is_range:
+            return location
+        if stage == 0:
+            # back at the seeds: the lowest seed in the range gives its location
+            seed = seed_ranges.lowest_in(start, end)
+            if seed is not None:
+                heapq.heappush(queue, (seed + shift, 0, 0, seed, seed + 1, shift))
+            continue
+        for source_start, source_end, offset in inverses[stage - 1].preimage(start, end):
+            heapq.heappush(queue, (source_start + shift + offset, 1, stage - 1, source_start, source_end, shift + offset))
+    return None
+
+def day5_2(file, reverse=False):
     """
     Solves Day 5, Part 2 of Advent of Code 2023.
 
     Parameters:
     - file: Input file containing seed information.
+    - reverse: Flag to search back from the lowest locations instead of translating all seed ranges forward.
     """
-    # Read input file
-    input_file = pathlib.Path(file)
-    seed_maps = dict()
-    with input_file.open('r') as file:
-        lines = file.readlines()
-
-    # Collect seeds
-    seeds = get_seeds(list(map(int, lines[0].strip().split(":")[1].split())))
-
-    # Collect seed_maps
-    map_lines = lines[2:]
-    for line in map_lines:
-        line_parts = line.strip().split()
-        if not line_parts:
-            seed_maps[key] = values
-        elif not line_parts[0].isdigit():
-            key = line_parts[0]
-            values = []
-        else:
-            values.append(list(map(int, line_parts)))
-    seed_maps[key] = values
-
-    # Loop through seeds and apply translations
-    locations = []
-    for seed in seeds:
-        seed = [seed]
-        for translate in seed_maps.values():
-            seed = from_source_to_destination_range(translate, seed)
-        locations.append(seed)
+    seeds, sections = read_almanac(file)
+    seed_ranges = IntervalSet(get_seeds(seeds))
+    if reverse:
+        print(lowest_location(seed_ranges, [SeedMap.from_entries(section) for section in sections]))
+        return
+    almanac = Almanac.from_sections(sections)
+
+    # Translate all seed ranges at once, stage by stage
+    locations = almanac.translate(seed_ranges)
     # print solution
-    print(min(sum(locations, []))[0])
+    print(locations.min())
 
-day5_2("day5_input.txt")
+if __name__ == "__main__":
+    day5("day5_input.txt")
+    day5_2("day5_input.txt")
@@ -1,7 +1,6 @@
 """ ADVENT OF CODE 2023 """
 import pathlib
 import math
-import numpy 
 
 # Day 6 
 
@@ -72,9 +71,35 @@ def solve_with_abc(a: float, b: float, c: float) -> list:
     else:
         return sorted([(-b - math.sqrt(discriminant)) / (2 * a), (-b + math.sqrt(discriminant)) / (2 * a)])
 
+def winning_pushes(time: int, distance: int) -> tuple:
+    """
+    Finds the first and the last push that beat the distance, exactly (integer square root, no floats).
+
+    Parameters:
+    - time: The time value.
+    - distance: The distance to beat.
+
+    Returns:
+    - tuple: The first and the last winning push, None if no push wins.
+    """
+    # Winning: (time - push) * push > distance, between the roots of push^2 - time * push + distance = 0
+    discriminant = calculate_D(1, -time, distance)
+    if discriminant < 0:
+        return None
+    # The lower root lies in ((time - root - 1) / 2, (time - root) / 2], step to the first integer above it
+    root = math.isqrt(discriminant)
+    first = max((time - root) // 2, 0)
+    while first <= time - first and calculate_distance(first, time) <= distance:
+        first += 1
+    # Pushes are symmetric around time / 2 (a tie with the distance is no win)
+    last = time - first
+    if first > last:
+        return None
+    return (first, last)
+
 def calculate_options_abc(time_distance: tuple) -> int:
     """
-    Solution using the abc-formula to calculate options based on time and distance.
+    Solution using the abc-formula to calculate options based on time and distance, exact for any size.
 
     Parameters:
     - time_distance: Tuple containing time and distance.
@@ -82,10 +107,52 @@ def calculate_options_abc(time_distance: tuple) -> int:
     Returns:
     - int: The calculated number of options.
     """
-    # Quadratic equation: -push^2 + time * push - distance = 0
-    # Coefficients: a = -1, b = time, c = -distance
-    solutions = solve_with_abc(-1, time_distance[0], -time_distance[1])
-    return math.ceil(solutions[1]) - (math.floor(solutions[0]) + 1)
+    pushes = winning_pushes(time_distance[0], time_distance[1])
+    if pushes is None:
+        return 0
+    return pushes[1] - pushes[0] + 1
+
+def calculate_options_many(times, distances):
+    """
+    Calculates the number of options for many races at once.
+
+    Parameters:
+    - times: The time values.
+    - distances: The distances to beat.
+
+    Returns:
+    - numpy.ndarray: The number of options per race.
+    """
+    import numpy
+
+    times = numpy.asarray(times)
+    distances = numpy.asarray(distances)
+    if not len(times):
+        return numpy.zeros(0, dtype=numpy.int64)
+    # Beyond int64 (time^2 or 4 * distance), races fall back to exact Python integers one by one
+    safe = numpy.asarray((times >= 0) & (times < 2 ** 31) & (distances >= 0) & (distances < 2 ** 60), dtype=bool)
+
+    safe_times = times[safe].astype(numpy.int64)
+    safe_distances = distances[safe].astype(numpy.int64)
+    discriminants = safe_times * safe_times - 4 * safe_distances
+    # Float square root, corrected to the exact integer square root
+    roots = numpy.floor(numpy.sqrt(numpy.maximum(discriminants, 0).astype(numpy.float64))).astype(numpy.int64)
+    for _ in range(2):
+        roots -= roots * roots > discriminants
+        roots += (roots + 1) * (roots + 1) <= discriminants
+    # Step to the first integer above the lower root (at most twice)
+    firsts = numpy.maximum((safe_times - roots) // 2, 0)
+    for _ in range(2):
+        firsts += (firsts <= safe_times - firsts) & ((safe_times - firsts) * firsts <= safe_distances)
+    options = numpy.maximum(safe_times - 2 * firsts + 1, 0)
+
+    if safe.all():
+        return numpy.where(discriminants < 0, 0, options)
+    all_options = numpy.zeros(len(times), dtype=object)
+    all_options[safe] = numpy.where(discriminants < 0, 0, options)
+    for index in numpy.flatnonzero(~safe):
+        all_options[index] = calculate_options_abc((int(times[index]), int(distances[index])))
+    return all_options
 
 def day6(file):
     """
@@ -109,9 +176,7 @@ def day6(file):
         ways_to_win.append(options)
 
     # Print the solution
-    print(numpy.prod(ways_to_win))
-
-day6("day6_input.txt")
+    print(math.prod(ways_to_win))
 
 # Part 2
 
@@ -136,4 +201,6 @@ def day6_2(file):
     # Print the solution
     print(options)
 
-day6_2("day6_input.txt")
+if __name__ == "__main__":
+    day6("day6_input.txt")
+    day6_2("day6_input.txt")
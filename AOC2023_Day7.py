@@ -1,5 +1,20 @@
 """ ADVENT OF CODE 2023 """
 import pathlib
+import zlib
+from array import array
+from functools import lru_cache
+from itertools import combinations_with_replacement, permutations
+
+# Cards from low to high, a hand is packed as a base 13 number of the card positions
+CARDS = '23456789TJQKA'
+JOKER_CARDS = 'J23456789TQKA'
+CARD_INDEX = {c: i for i, c in enumerate(CARDS)}
+HANDS = 13 ** 5
+
+# Hand types of every packed hand, normal rules first and joker rules second
+TYPE_TABLE_FILE = pathlib.Path(__file__).with_name('day7_types.bin')
+# Raise the version whenever build_type_table changes, so tables cached by older code are built again
+TYPE_TABLE_VERSION = 1
 
 def hand_pattern(hand: str, joker=False) -> list:
     """
@@ -118,33 +133,358 @@ def compare(hand1: str, hand2: str, joker=False) -> int:
     # Same 
     return 0
 
-def insert_ranklist(rank_list, card_tuple, joker=False):
+# Hand type by (highest count, number of different cards) of the pattern, from high card (0) to five of a kind (6)
+HAND_TYPES = {
+    (1, 5): 0,  # High card
+    (2, 4): 1,  # One pair
+    (2, 3): 2,  # Two pair
+    (3, 3): 3,  # Three of a kind
+    (3, 2): 4,  # Full house
+    (4, 2): 5,  # Four of a kind
+    (5, 1): 6,  # Five of a kind
+}
+
+def pattern_type(hand: str, joker=False) -> int:
     """
-    Inserts a card into a rank list.
+    Determines the type of a hand of cards from its pattern.
 
     Parameters:
-    - rank_list: The rank list to insert the card into.
-    - card_tuple: A tuple representing the card and its bid.
+    - hand: A string representing the hand of cards.
     - joker: A boolean indicating whether Jokers should be considered.
 
     Returns:
-    - list: The updated rank list.
-    """
-    # Start list with the first entry
-    if len(rank_list) == 0:
-        rank_list.append(card_tuple)
-    else:
-        cursor = 0
-        
-        # Find the right place to insert by comparing until not greater (no cards are equal)
-        while compare(card_tuple[0], rank_list[cursor][0], joker) > 0:
-            cursor += 1
-            if cursor > len(rank_list) - 1:
-                break
-
-        rank_list.insert(cursor, card_tuple)
-    
-    return rank_list
+    - int: The type of the hand, from 0 (high card) to 6 (five of a kind).
+    """
+    pattern = hand_pattern(hand, joker)
+    return HAND_TYPES[(max(pattern), len(pattern))]
+
+def pack_hand(hand: str) -> int:
+    """
+    Packs a hand of cards into a single number.
+
+    Parameters:
+    - hand: A string representing the hand of cards.
+
+    Returns:
+    - int: The hand as a base 13 number of the card positions in CARDS.
+    """
+    packed = 0
+    for c in hand:
+        packed = packed * 13 + CARD_INDEX[c]
+    return packed
+
+def build_type_table() -> bytearray:
+    """
+    Determines the type of every possible hand, for normal and for joker rules.
+
+    Returns:
+    - bytearray: The type of each packed hand with normal rules, followed by the types with joker rules.
+    """
+    table = bytearray(2 * HANDS)
+    # The type only depends on which cards are in the hand, so classify each combination once
+    for combination in combinations_with_replacement(CARDS, 5):
+        hand = ''.join(combination)
+        normal = pattern_type(hand)
+        with_joker = pattern_type(hand, True)
+        for order in set(permutations(hand)):
+            packed = pack_hand(order)
+            table[packed] = normal
+            table[HANDS + packed] = with_joker
+    return table
+
+def type_table_header() -> bytes:
+    """
+    Gives the header of the cached hand type table: the version and a checksum of the rules it was built with.
+
+    Returns:
+    - bytes: The header, followed on disk by the CRC-32 of the table and the table itself.
+    """
+    rules = f"{CARDS} {JOKER_CARDS} {sorted(HAND_TYPES.items())}".encode()
+    return b'AOC7' + TYPE_TABLE_VERSION.to_bytes(2, 'little') + zlib.crc32(rules).to_bytes(4, 'little')
+
+@lru_cache(maxsize=None)
+def get_type_table() -> bytes:
+    """
+    Gets the hand type table, read from disk if cached there and otherwise built (and cached) once. The cached table
+    is only used if its header and checksum match (see type_table_header).
+
+    Returns:
+    - bytes: The hand type table (see build_type_table).
+    """
+    header = type_table_header()
+    try:
+        cached = TYPE_TABLE_FILE.read_bytes()
+        table = cached[len(header) + 4:]
+        # a table of another version, other rules or damaged on disk is built again
+        if cached.startswith(header) and len(table) == 2 * HANDS \
+                and int.from_bytes(cached[len(header):len(header) + 4], 'little') == zlib.crc32(table):
+            return table
+    except OSError:
+        pass
+    table = bytes(build_type_table())
+    try:
+        TYPE_TABLE_FILE.write_bytes(header + zlib.crc32(table).to_bytes(4, 'little') + table)
+    except OSError:
+        # Not being able to cache the table only costs building it again next time
+        pass
+    return table
+
+def hand_type(hand: str, joker=False) -> int:
+    """
+    Determines the type of a hand of cards by looking it up in the hand type table.
+
+    Parameters:
+    - hand: A string representing the hand of cards.
+    - joker: A boolean indicating whether Jokers should be considered.
+
+    Returns:
+    - int: The type of the hand, from 0 (high card) to 6 (five of a kind).
+    """
+    return get_type_table()[joker * HANDS + pack_hand(hand)]
+
+def hand_key(hand: str, joker=False) -> int:
+    """
+    Converts a hand of cards to a single integer that sorts like the hands rank.
+
+    Parameters:
+    - hand: A string representing the hand of cards.
+    - joker: A boolean indicating whether Jokers should be considered.
+
+    Returns:
+    - int: The key: the type of the hand followed by the points of each card (base 15 digits).
+    """
+    key = hand_type(hand, joker)
+    for c in hand:
+        key = key * 15 + card_points(c, joker)
+    return key
+
+def read_hand_matrix(file, joker=False) -> tuple:
+    """
+    Reads all hands into a matrix of card points and all bids into a vector.
+
+    Parameters:
+    - file: Input file containing the hand of cards and bids.
+    - joker: A boolean indicating whether Jokers should be considered.
+
+    Returns:
+    - tuple: The card points (numpy.ndarray of uint8, one row of 5 per hand) and the bids (numpy.ndarray of int64).
+    """
+    import numpy
+
+    # Card points of every byte, the same as card_points
+    points = numpy.zeros(256, dtype=numpy.uint8)
+    for c in CARDS:
+        points[ord(c)] = card_points(c, joker)
+
+    input_file = pathlib.Path(file)
+    # Hands and bids alternate
+    tokens = input_file.read_bytes().split()
+    hands = numpy.frombuffer(b''.join(tokens[0::2]), dtype=numpy.uint8).reshape(-1, 5)
+    bids = numpy.fromstring(b' '.join(tokens[1::2]).decode(), dtype=numpy.int64, sep=' ')
+    return (points[hands], bids)
+
+def hand_types_many(hands, joker=False, chunk_size=2 ** 20):
+    """
+    Determines the type of many hands of cards at once.
+
+    Parameters:
+    - hands: The card points of the hands (numpy.ndarray, one row of 5 per hand, see read_hand_matrix).
+    - joker: A boolean indicating whether Jokers should be considered.
+    - chunk_size: The number of hands to count at once (bounds the memory of the card histograms).
+
+    Returns:
+    - numpy.ndarray: The type of each hand, from 0 (high card) to 6 (five of a kind).
+    """
+    import numpy
+
+    # Hand type by highest count and number of different cards
+    types_by_pattern = numpy.zeros((6, 6), dtype=numpy.uint8)
+    for (highest, different), rank in HAND_TYPES.items():
+        types_by_pattern[highest, different] = rank
+
+    types = numpy.empty(len(hands), dtype=numpy.uint8)
+    for start in range(0, len(hands), chunk_size):
+        chunk = hands[start:start + chunk_size]
+        rows = len(chunk)
+        # Histogram of the card points (0 to 14) of each hand
+        cells = chunk + numpy.arange(rows, dtype=numpy.int64)[:, None] * 15
+        counts = numpy.bincount(cells.ravel(), minlength=rows * 15).reshape(rows, 15)
+        if joker:
+            # Add jokers (1 point) to the highest count, five jokers are five of a kind
+            jokers = counts[:, 1].copy()
+            counts[:, 1] = 0
+            highest = counts.max(axis=1) + jokers
+            different = numpy.maximum(numpy.count_nonzero(counts, axis=1), 1)
+        else:
+            highest = counts.max(axis=1)
+            different = numpy.count_nonzero(counts, axis=1)
+        types[start:start + rows] = types_by_pattern[highest, different]
+    return types
+
+def day7_numpy(file, joker=False) -> None:
+    """
+    Solves Day 7 of Advent of Code 2023 with all hands in NumPy arrays.
+
+    Parameters:
+    - file: Input file containing the hand of cards and bids.
+    - joker: A boolean indicating whether Jokers should be considered.
+    """
+    import numpy
+
+    hands, bids = read_hand_matrix(file, joker)
+    types = hand_types_many(hands, joker)
+
+    # Rank by type first, then card by card from the head (lexsort takes the primary key last)
+    order = numpy.lexsort((hands[:, 4], hands[:, 3], hands[:, 2], hands[:, 1], hands[:, 0], types))
+    ranks = numpy.arange(1, len(order) + 1, dtype=numpy.int64)
+
+    # Print solution
+    print(int(bids[order] @ ranks))
+
+class RankTree:
+    """
+    Class representing a changing set of hands with bids, ranked at all times.
+
+    Two Fenwick trees over all possible hands (type first, then the cards in order) keep the number of hands and the sum
+    of the bids up to each hand, so inserting, removing, ranking and the total winnings all take O(log n).
+
+    A hand may be inserted more than once. Equal hands are ranked in the order they were inserted, like the stable sort
+    of day7 ranks them in the order of the input.
+    """
+    def __init__(self, joker=False) -> None:
+        self.joker = joker
+        self.order = {c: i for i, c in enumerate(JOKER_CARDS if joker else CARDS)}
+        self.size = 7 * HANDS
+        self.counts = array('q', bytes(8 * (self.size + 1)))
+        self.bid_sums = array('q', bytes(8 * (self.size + 1)))
+        self.bids = {}
+        self.count = 0
+        self.total = 0
+
+    def __len__(self) -> int:
+        return self.count
+
+    def __contains__(self, hand: str) -> bool:
+        return hand in self.bids
+
+    def _index(self, hand: str) -> int:
+        """
+        Gives the position of a hand among all possible hands, weakest first (1 based).
+        """
+        index = hand_type(hand, self.joker)
+        for c in hand:
+            index = index * 13 + self.order[c]
+        return index + 1
+
+    def _add(self, tree: array, index: int, value: int) -> None:
+        while index <= self.size:
+            tree[index] += value
+            index += index & -index
+
+    def _prefix(self, tree: array, index: int) -> int:
+        total = 0
+        while index:
+            total += tree[index]
+            index -= index & -index
+        return total
+
+    def _shift(self, index: int, bid: int) -> int:
+        """
+        Gives the change of the winnings when a hand at a position is added after the equal hands: its own winnings
+        plus one more rank for all stronger hands.
+        """
+        rank = self._prefix(self.counts, index) + 1
+        stronger = self._prefix(self.bid_sums, self.size) - self._prefix(self.bid_sums, index)
+        return rank * bid + stronger
+
+    def insert(self, hand: str, bid: int) -> None:
+        """
+        Adds a hand with its bid, ranked above the equal hands inserted before.
+
+        Parameters:
+        - hand: A string representing the hand of cards.
+        - bid: The bid of the hand.
+        """
+        index = self._index(hand)
+        self.total += self._shift(index, bid)
+        self._add(self.counts, index, 1)
+        self._add(self.bid_sums, index, bid)
+        self.bids.setdefault(hand, []).append(bid)
+        self.count += 1
+
+    def remove(self, hand: str, bid=None) -> int:
+        """
+        Removes a hand: the last inserted one, or the last inserted one with the given bid.
+
+        Parameters:
+        - hand: A string representing the hand of cards.
+        - bid: The bid of the hand to remove, any bid if None.
+
+        Returns:
+        - int: The bid of the removed hand.
+        """
+        bids = self.bids[hand]
+        position = len(bids) - 1
+        if bid is not None:
+            while position >= 0 and bids[position] != bid:
+                position -= 1
+            if position < 0:
+                raise KeyError((hand, bid))
+        bid = bids.pop(position)
+        if not bids:
+            del self.bids[hand]
+        index = self._index(hand)
+        self._add(self.counts, index, -1)
+        self._add(self.bid_sums, index, -bid)
+        # the removed hand ranked below the equal hands inserted after it, which swap their rank with it one by one
+        self.total -= self._shift(index, bid) + sum(later - bid for later in bids[position:])
+        self.count -= 1
+        return bid
+
+    def rank(self, hand: str) -> int:
+        """
+        Gives the rank of a hand, 1 for the weakest. Of equal hands, gives the rank of the first inserted one: the others
+        follow it in order of insertion.
+
+        Parameters:
+        - hand: A string representing the hand of cards.
+
+        Returns:
+        - int: The rank of the hand.
+        """
+        if hand not in self.bids:
+            raise KeyError(hand)
+        return self._prefix(self.counts, self._index(hand) - 1) + 1
+
+    def winnings(self) -> int:
+        """
+        Gives the total winnings: the sum of the rank times the bid of every hand.
+
+        Returns:
+        - int: The total winnings.
+        """
+        return self.total
+
+def read_rank_tree(file, joker=False) -> RankTree:
+    """
+    Reads all hands and bids into a rank tree.
+
+    Parameters:
+    - file: Input file containing the hand of cards and bids.
+    - joker: A boolean indicating whether Jokers should be considered.
+
+    Returns:
+    - RankTree: The ranked hands.
+    """
+    ranked = RankTree(joker)
+    input_file = pathlib.Path(file)
+    with input_file.open('r') as file:
+        for line in file:
+            if not line.strip():
+                continue
+            hand, bid = line.split()
+            ranked.insert(hand, int(bid))
+    return ranked
 
 # Day 7
 def day7(file, joker=False):
@@ -155,20 +495,21 @@ def day7(file, joker=False):
     - file: Input file containing the hand of cards and bids.
     - joker: A boolean indicating whether Jokers should be considered.
     """
-    ranklist = []
+    hands = []
 
     # Read input
     input_file = pathlib.Path(file)
     with input_file.open('r') as file:
-        # Loop through input to build a sorted list
         for line in file:
-            card = line.strip().split()[0]
-            bid = int(line.strip().split()[1])
+            if not line.strip():
+                continue
+            card, bid = line.split()
             # Keep card and bid together to rank
-            card_tuple = (card, bid)
-            # Add to ranklist
-            ranklist = insert_ranklist(ranklist, card_tuple, joker)
-    
+            hands.append((card, int(bid)))
+
+    # Rank the hands by their key, weakest first
+    ranklist = sorted(hands, key=lambda card_tuple: hand_key(card_tuple[0], joker))
+
     # Calculate winnings
     rank = 1
     winnings = 0
@@ -179,7 +520,6 @@ def day7(file, joker=False):
     # Print solution
     print(winnings)
 
-day7("day7_input.txt")
-
-# Part 2
-day7("day7_input.txt", True)
+if __name__ == "__main__":
+    day7("day7_input.txt")
+    day7("day7_input.txt", True)
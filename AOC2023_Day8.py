@@ -1,7 +1,9 @@
 """ ADVENT OF CODE 2023 """
 
+import math
 import pathlib
-from numpy import lcm  
+from array import array
+from collections import OrderedDict, deque
 
 def read_input(file) -> tuple:
     """
@@ -42,41 +44,443 @@ def has_last_char_of(char: chr, string: str) -> bool:
     """
     return string[-1] == char
 
-def find_steps(loc: tuple, instructions: str, network: dict, part2=False) -> int:
+class Network:
     """
-    Calculate the number of steps needed to reach a destination based on instructions.
+    Class representing the network with the nodes interned as integer ids (in order of the input).
+
+    The left and right successors and the instructions (0 for L, 1 for R) are arrays of ints. For whole passes through
+    the instructions there is a jump table: where each node ends after one pass (filled for the nodes a walk visits),
+    and after 2^k passes (binary lifting).
+    Walks to the next end node are remembered per (node, offset) in a bounded memo, shared by all walks.
+    """
+    def __init__(self, names: list, left: array, right: array, instructions: array, memo_size=2 ** 20) -> None:
+        self.names = names
+        self.ids = {name: node for node, name in enumerate(names)}
+        self.left = left
+        self.right = right
+        self.instructions = instructions
+        self.pass_ends = array('l', [-1]) * len(names)
+        self.jumps = []
+        self.first_ends = {}
+        self.end_masks = {}
+        self.memo_size = memo_size
+        self.hit_memo = OrderedDict()
+
+    @classmethod
+    def from_input(cls, instructions: str, network: dict) -> 'Network':
+        """
+        Make a network of the instructions and network dictionary of read_input.
+
+        Args:
+            instructions (str): A string of instructions.
+            network (dict): The network dictionary.
+
+        Returns:
+            Network: The interned network.
+        """
+        names = list(network)
+        ids = {name: node for node, name in enumerate(names)}
+        left = array('l', (ids[children[0]] for children in network.values()))
+        right = array('l', (ids[children[1]] for children in network.values()))
+        return cls(names, left, right, array('b', (instruction == 'R' for instruction in instructions.strip())))
+
+    def __len__(self) -> int:
+        return len(self.names)
+
+    def end_mask(self, part2=False) -> bytearray:
+        """
+        Mark the nodes that end a walk: 'ZZZ', or for part 2 every node ending with 'Z'.
+
+        Args:
+            part2 (bool): Flag indicating whether to consider part 2.
+
+        Returns:
+            bytearray: 1 for each end node, 0 otherwise.
+        """
+        if part2 not in self.end_masks:
+            if part2:
+                self.end_masks[part2] = bytearray(has_last_char_of('Z', name) for name in self.names)
+            else:
+                self.end_masks[part2] = bytearray(name == 'ZZZ' for name in self.names)
+        return self.end_masks[part2]
+
+    def step(self, node: int, offset: int) -> int:
+        """
+        Take one step from a node.
+
+        Args:
+            node (int): The node id.
+            offset (int): The position in the instructions.
+
+        Returns:
+            int: The node id after the step.
+        """
+        if self.instructions[offset]:
+            return self.right[node]
+        return self.left[node]
+
+    def walk_pass(self, node: int, ends=None) -> tuple:
+        """
+        Walk one whole pass through the instructions from a node.
+
+        Args:
+            node (int): The node id to start from.
+            ends (bytearray): Optional end mask (see end_mask) to look for.
+
+        Returns:
+            tuple: The node id after the pass and the first step (1 based) that reaches an end node (0 if none).
+        """
+        left = self.left
+        right = self.right
+        first_end = 0
+        for steps, instruction in enumerate(self.instructions, 1):
+            node = right[node] if instruction else left[node]
+            if ends is not None and not first_end and ends[node]:
+                first_end = steps
+        return (node, first_end)
+
+    def end_steps(self, node: int, ends: bytearray) -> list:
+        """
+        Find all steps of one whole pass through the instructions that reach an end node.
+
+        Args:
+            node (int): The node id to start from.
+            ends (bytearray): The end mask (see end_mask).
+
+        Returns:
+            list: The steps (1 based) reaching an end node.
+        """
+        left = self.left
+        right = self.right
+        start = node
+        found = []
+        for steps, instruction in enumerate(self.instructions, 1):
+            node = right[node] if instruction else left[node]
+            if ends[node]:
+                found.append(steps)
+        self.pass_ends[start] = node
+        return found
+
+    def next_hit(self, node: int, offset: int, part2=True) -> tuple:
+        """
+        Find the next end node of a walk, using and filling the memo of walks already done.
+
+        Args:
+            node (int): The node id to start from.
+            offset (int): The position in the instructions to start from.
+            part2 (bool): Flag indicating whether to consider part 2.
+
+        Returns:
+            tuple: The number of steps (at least 1) and the end node id reached.
+        """
+        memo = self.hit_memo
+        ends = self.end_mask(part2)
+        length = len(self.instructions)
+        start = node
+        # Only the states nearest to the end node can be remembered, keep no more of the path than fit in the memo
+        path = deque(maxlen=self.memo_size)
+        walked = 0
+        result = None
+        # Without an end node in as many steps as there are states, the walk repeats forever
+        for _ in range(len(self) * length):
+            key = (node, offset, part2)
+            if key in memo:
+                memo.move_to_end(key)
+                result = memo[key]
+                break
+            path.append(key)
+            walked += 1
+            node = self.step(node, offset)
+            offset = (offset + 1) % length
+            if ends[node]:
+                result = (0, node)
+                break
+        if result is None:
+            raise ValueError(f"no end node reachable from {self.names[start]}")
+
+        # Every state on the path reaches the same end node, insert the nearest last so they are evicted last
+        steps, end = result
+        for to_go, key in zip(range(len(path), 0, -1), path):
+            memo[key] = (steps + to_go, end)
+            memo.move_to_end(key)
+        while len(memo) > self.memo_size:
+            memo.popitem(last=False)
+        return (steps + walked, end)
+
+    def find_cycle(self, node: int, part2=False) -> tuple:
+        """
+        Find the cycle of a walk from a node: the walk repeats as soon as it is at the same node at the start of a pass.
+
+        Args:
+            node (int): The node id to start from.
+            part2 (bool): Flag indicating whether to consider part 2.
+
+        Returns:
+            tuple: The steps reaching an end node before the cycle (up to and including the cycle start), the step
+            the cycle starts, its length, and the steps reaching an end node in the first round of the cycle.
+        """
+        ends = self.end_mask(part2)
+        length = len(self.instructions)
+        seen = {}
+        hits = []
+        while node not in seen:
+            seen[node] = len(seen)
+            start = seen[node] * length
+            hits.extend(start + steps for steps in self.end_steps(node, ends))
+            node = self.pass_ends[node]
+        cycle_start = seen[node] * length
+        cycle_length = len(seen) * length - cycle_start
+        before = [hit for hit in hits if hit <= cycle_start]
+        in_cycle = [hit for hit in hits if hit > cycle_start]
+        return (before, cycle_start, cycle_length, in_cycle)
+
+    def pass_end(self, node: int) -> int:
+        """
+        Find where a node ends after one whole pass, walked when first needed.
+
+        Args:
+            node (int): The node id.
+
+        Returns:
+            int: The node id after one pass.
+        """
+        if self.pass_ends[node] < 0:
+            self.pass_ends[node] = self.walk_pass(node)[0]
+        return self.pass_ends[node]
+
+    def first_end(self, node: int, part2=False) -> int:
+        """
+        Find the first step of a whole pass from a node that reaches an end node, walked when first needed.
+
+        Args:
+            node (int): The node id.
+            part2 (bool): Flag indicating whether to consider part 2.
+
+        Returns:
+            int: The first step (1 based) reaching an end node, 0 if none.
+        """
+        if part2 not in self.first_ends:
+            self.first_ends[part2] = array('l', [-1]) * len(self)
+        first_ends = self.first_ends[part2]
+        if first_ends[node] < 0:
+            self.pass_ends[node], first_ends[node] = self.walk_pass(node, self.end_mask(part2))
+        return first_ends[node]
+
+    def pass_table(self, level=0) -> array:
+        """
+        Get the jump table of 2^level whole passes for all nodes, built when first needed.
+
+        Args:
+            level (int): The power of two of the number of passes.
+
+        Returns:
+            array: The node id after 2^level passes, per node id.
+        """
+        if not self.jumps:
+            for node in range(len(self)):
+                self.pass_end(node)
+            self.jumps.append(self.pass_ends)
+        while len(self.jumps) <= level:
+            jump = self.jumps[-1]
+            self.jumps.append(array('l', (jump[node] for node in jump)))
+        return self.jumps[level]
+
+    def advance(self, node: int, steps: int, offset=0) -> int:
+        """
+        Find the node reached after a number of steps, in logarithmic time for whole passes.
+
+        Args:
+            node (int): The node id to start from.
+            steps (int): The number of steps.
+            offset (int): The position in the instructions to start from.
+
+        Returns:
+            int: The node id after the steps.
+        """
+        length = len(self.instructions)
+        # Step to the start of the instructions
+        while steps and offset:
+            node = self.step(node, offset)
+            offset = (offset + 1) % length
+            steps -= 1
+        # Jump the whole passes by their binary digits
+        passes, steps = divmod(steps, length)
+        level = 0
+        while passes:
+            if passes & 1:
+                node = self.pass_end(node) if level == 0 else self.pass_table(level)[node]
+            passes >>= 1
+            level += 1
+        # Step the rest
+        for offset in range(steps):
+            node = self.step(node, offset)
+        return node
+
+    def find_steps(self, node: int, part2=False) -> int:
+        """
+        Calculate the number of steps from a node to an end node, a whole pass at a time.
+
+        Args:
+            node (int): The node id to start from.
+            part2 (bool): Flag indicating whether to consider part 2.
+
+        Returns:
+            int: The number of steps needed.
+        """
+        steps = 0
+        # Without an end node in as many passes as there are nodes, the walk repeats forever
+        for _ in range(len(self)):
+            first_end = self.first_end(node, part2)
+            if first_end:
+                return steps + first_end
+            node = self.pass_ends[node]
+            steps += len(self.instructions)
+        raise ValueError(f"no end node reachable from {self.names[node]}")
+
+def read_network(file) -> Network:
+    """
+    Read input from a file into an interned network.
 
     Args:
-        loc (tuple): The current location (parent:key, children:tuple).
-        instructions (str): A string of instructions.
-        network (dict): The network dictionary.
-        part2 (bool): Flag indicating whether to consider part 2.
+        file (str): The path to the input file.
 
     Returns:
-        int: The number of steps needed.
-    """
-    cursor = 0
-    steps = 0
-    new_loc = loc[0]  # Initialize new_loc outside the loop
-
-    while True:
-        steps += 1
-        instruction = instructions[cursor]
-        
-        if instruction == 'L':
-            new_loc = loc[0]
-        if instruction == 'R':
-            new_loc = loc[1]
-        
-        if new_loc == 'ZZZ' or (part2 and has_last_char_of('Z', new_loc)):
+        Network: The network.
+    """
+    return Network.from_input(*read_input(file))
+
+def crt(residue1: int, modulus1: int, residue2: int, modulus2: int):
+    """
+    Combine two congruences x = residue1 (mod modulus1) and x = residue2 (mod modulus2), the moduli need not be coprime.
+
+    Args:
+        residue1 (int): The first residue.
+        modulus1 (int): The first modulus.
+        residue2 (int): The second residue.
+        modulus2 (int): The second modulus.
+
+    Returns:
+        tuple: The combined residue and modulus (the least common multiple), None if there is no solution.
+    """
+    gcd = math.gcd(modulus1, modulus2)
+    if (residue2 - residue1) % gcd:
+        return None
+    modulus = modulus1 // gcd * modulus2
+    factor = (residue2 - residue1) // gcd * pow(modulus1 // gcd, -1, modulus2 // gcd) % (modulus2 // gcd)
+    return ((residue1 + factor * modulus1) % modulus, modulus)
+
+def is_hit(cycle: tuple, steps: int) -> bool:
+    """
+    Check if a walk is at an end node after a number of steps.
+
+    Args:
+        cycle (tuple): The cycle of the walk (see Network.find_cycle).
+        steps (int): The number of steps.
+
+    Returns:
+        bool: True if the walk is at an end node, False otherwise.
+    """
+    before, cycle_start, cycle_length, in_cycle = cycle
+    if steps <= cycle_start:
+        return steps in before
+    return (steps - cycle_start - 1) % cycle_length + cycle_start + 1 in in_cycle
+
+def first_common_hit(cycles: list):
+    """
+    Find the first step at which all walks are at an end node at the same time.
+
+    Args:
+        cycles (list): The cycle of each walk (see Network.find_cycle).
+
+    Returns:
+        int: The number of steps, None if the walks never end together.
+    """
+    # Before all walks are in their cycle, try the hits of one walk
+    last_start = max(cycle[1] for cycle in cycles)
+    before, cycle_start, cycle_length, in_cycle = cycles[0]
+    candidates = list(before)
+    for hit in in_cycle:
+        candidates.extend(range(hit, last_start + 1, cycle_length))
+    for steps in sorted(candidates):
+        if steps > last_start:
             break
+        if all(is_hit(cycle, steps) for cycle in cycles[1:]):
+            return steps
 
-        loc = network[new_loc]
-        cursor += 1
-        # Start instructions again if necessary
-        cursor = cursor % (len(instructions) - 1)
+    # After that all walks repeat: combine the residues of their hits
+    residues = {0}
+    modulus = 1
+    for _, _, cycle_length, in_cycle in cycles:
+        combined = set()
+        for residue in residues:
+            for hit in in_cycle:
+                solution = crt(residue, modulus, hit, cycle_length)
+                if solution is not None:
+                    combined.add(solution[0])
+                    new_modulus = solution[1]
+        if not combined:
+            return None
+        residues = combined
+        modulus = new_modulus
+    # The first step after last_start for each residue
+    return min(residue + (last_start - residue) // modulus * modulus + modulus for residue in residues)
 
-    return steps
+def simulate_ghosts(network: Network, starts: list, part2=True, max_steps=10 ** 8):
+    """
+    Walk from all starting nodes in lock-step, as one NumPy array of node ids, until all are at an end node together.
+
+    Args:
+        network (Network): The network.
+        starts (list): The node ids to start from.
+        part2 (bool): Flag indicating whether to consider part 2.
+        max_steps (int): The number of steps to give up after.
+
+    Returns:
+        int: The number of steps needed, None if not reached within max_steps.
+    """
+    import numpy
+
+    # Successors by instruction: row 0 for L, row 1 for R
+    successors = numpy.array([network.left, network.right], dtype=numpy.intp)
+    instructions = numpy.array(network.instructions, dtype=numpy.intp)
+    ends = numpy.frombuffer(bytes(network.end_mask(part2)), dtype=numpy.bool_)
+    nodes = numpy.array(starts, dtype=numpy.intp)
+
+    length = len(instructions)
+    for steps in range(1, max_steps + 1):
+        nodes = successors[instructions[(steps - 1) % length], nodes]
+        if ends[nodes].all():
+            return steps
+    return None
+
+def chase_ghosts(network: Network, starts: list, part2=True, max_steps=10 ** 12):
+    """
+    Walk from all starting nodes from end node to end node, always moving the walks that are behind, until all are at an
+    end node together. Walks that meet on the same (node, offset) share the memo of the network.
+
+    Args:
+        network (Network): The network.
+        starts (list): The node ids to start from.
+        part2 (bool): Flag indicating whether to consider part 2.
+        max_steps (int): The number of steps to give up after.
+
+    Returns:
+        int: The number of steps needed, None if not reached within max_steps.
+    """
+    length = len(network.instructions)
+    ghosts = [(0, node) for node in starts]
+    target = 1
+    while target <= max_steps:
+        for index, (steps, node) in enumerate(ghosts):
+            # Move up to the step of the walk furthest ahead
+            while steps < target:
+                walked, node = network.next_hit(node, steps % length, part2)
+                steps += walked
+            ghosts[index] = (steps, node)
+            target = steps
+        if all(steps == target for steps, _ in ghosts):
+            return target
+    return None
 
 def day8(file):
     """
@@ -86,42 +490,50 @@ def day8(file):
         file (str): The path to the input file.
     """
     # Read input
-    data = read_input(file)
-    instructions = data[0]
-    network = data[1]
+    network = read_network(file)
 
     # Follow instructions to find steps
-    steps = find_steps(network['AAA'], instructions, network)
+    steps = network.find_steps(network.ids['AAA'])
 
     # Solution
     print(steps)
 
-day8("day8_input.txt")
-
 # Part 2
 
-def day8_2(file):
+def day8_2(file, method='cycles', max_steps=10 ** 8):
     """
     Solve Part 2 of Day 8 problem.
 
     Args:
         file (str): The path to the input file.
+        method (str): 'cycles' to combine the cycles of the locations, 'lockstep' to walk all locations step by step,
+            'memo' to walk the locations from end node to end node with a shared memo.
+        max_steps (int): The number of steps to give up walking after ('lockstep' and 'memo').
     """
     # Read input
-    data = read_input(file)
-    instructions = data[0]
-    network = data[1]
+    network = read_network(file)
 
     # Find starting locations
-    locations = [network[loc] for loc in network.keys() if has_last_char_of('A', loc)]
+    locations = [node for node, name in enumerate(network.names) if has_last_char_of('A', name)]
 
-    # Follow instructions per location to find steps per location
-    steps_locations = []
-    for loc in locations:
-        steps = find_steps(loc, instructions, network, part2=True)
-        steps_locations.append(steps)
+    if method in ('lockstep', 'memo'):
+        # Follow instructions for all locations at once
+        if method == 'lockstep':
+            steps = simulate_ghosts(network, locations, max_steps=max_steps)
+        else:
+            steps = chase_ghosts(network, locations, max_steps=max_steps)
+        if steps is None:
+            raise ValueError(f"the locations do not reach end nodes at the same time within {max_steps} steps")
+    else:
+        # Follow instructions per location to find the cycle per location
+        cycles = [network.find_cycle(loc, part2=True) for loc in locations]
 
-    # Solution is the least common multiple of all steps needed
-    print(lcm.reduce(steps_locations))
+        # Solution is the first step all locations are at an end node together
+        steps = first_common_hit(cycles)
+    if steps is None:
+        raise ValueError("the locations never reach end nodes at the same time")
+    print(steps)
 
-day8_2("day8_input.txt")
+if __name__ == "__main__":
+    day8("day8_input.txt")
+    day8_2("day8_input.txt")
@@ -1,5 +1,6 @@
 """ ADVENT OF CODE 2023 """
 
+import math
 import pathlib
 
 def read_input(file):
@@ -90,15 +91,192 @@ def is_all_null(lst:list) -> bool:
             return False
     return True
 
-def day9(file, part2=False):
+def binomial_weights(length: int, part2=False) -> list:
+    """
+    Calculate the weights that extrapolate a sequence in one go: the next (or previous) element is the sum of the
+    elements times these weights, the same as summing the lasts (or firsts) of all differences.
+
+    Args:
+        length (int): The length of the sequence.
+        part2 (bool): Flag to get the weights of the previous element instead of the next one.
+
+    Returns:
+        list: The weight of each element of the sequence.
+    """
+    if part2:
+        return [(-1) ** i * math.comb(length, i + 1) for i in range(length)]
+    return [(-1) ** (length - 1 - i) * math.comb(length, i) for i in range(length)]
+
+def read_matrices(file) -> list:
+    """
+    Read input from a file straight into matrices, one per sequence length (one row per sequence).
+
+    Args:
+        file (str): The path to the input file.
+
+    Returns:
+        list: The matrices (numpy.ndarray of int64, or of Python ints for values beyond int64).
+    """
+    import numpy
+
+    data = pathlib.Path(file).read_bytes()
+    # Count the numbers per line: a number starts where whitespace (space, tab, CR, LF) ends
+    buffer = numpy.frombuffer(data, dtype=numpy.uint8)
+    whitespace = buffer <= ord(' ')
+    starts = ~whitespace
+    starts[1:] &= whitespace[:-1]
+    line_ends = numpy.append(numpy.flatnonzero(buffer == ord('\n')), len(buffer))
+    counts = numpy.diff(numpy.searchsorted(numpy.flatnonzero(starts), line_ends), prepend=0)
+    counts = counts[counts > 0]
+
+    # Parse all numbers in one go, values beyond int64 are clipped to its limits: parse those exactly
+    numbers = numpy.fromstring(data.decode(), dtype=numpy.int64, sep=' ')
+    limits = numpy.iinfo(numpy.int64)
+    if len(numbers) and (numbers.max() == limits.max or numbers.min() == limits.min):
+        numbers = numpy.array([int(number) for number in data.split()], dtype=object)
+
+    # Gather the rows of each length
+    firsts = numpy.cumsum(counts) - counts
+    matrices = []
+    for length in numpy.unique(counts).tolist():
+        rows = firsts[counts == length]
+        matrices.append(numbers[rows[:, None] + numpy.arange(length)])
+    return matrices
+
+def extrapolate_matrix(matrix, part2=False):
+    """
+    Calculate the next (or previous) element of the sequences in the rows of a matrix, as one matrix product.
+
+    Args:
+        matrix (numpy.ndarray): The sequences, all of the same length (int64, or object for Python ints).
+        part2 (bool): Flag to get the previous elements instead of the next ones.
+
+    Returns:
+        numpy.ndarray: The next (or previous) element of each sequence.
+    """
+    import numpy
+
+    length = matrix.shape[1]
+    weights = binomial_weights(length, part2)
+    if matrix.dtype != object:
+        largest = max(int(matrix.max(initial=0)), -int(matrix.min(initial=0)))
+        # The weights add up to at most 2^length in absolute value, stay exact with Python ints beyond int64 (for the
+        # weights themselves as well as for the products)
+        if length < 63 and largest << length < 2 ** 63:
+            return matrix @ numpy.array(weights, dtype=numpy.int64)
+        matrix = matrix.astype(object)
+    return matrix @ numpy.array(weights, dtype=object)
+
+def extrapolate_many(histories: list, part2=False) -> list:
+    """
+    Calculate the next (or previous) element of many sequences, as one matrix product per sequence length.
+
+    Args:
+        histories (list): The input sequences.
+        part2 (bool): Flag to get the previous elements instead of the next ones.
+
+    Returns:
+        list: The next (or previous) element of each sequence.
+    """
+    import numpy
+
+    # Sequences of the same length share the weights
+    lengths = {}
+    for index, history in enumerate(histories):
+        lengths.setdefault(len(history), []).append(index)
+
+    predictions = [0] * len(histories)
+    for indices in lengths.values():
+        rows = [histories[index] for index in indices]
+        try:
+            matrix = numpy.array(rows, dtype=numpy.int64)
+        except OverflowError:
+            matrix = numpy.array(rows, dtype=object)
+        for index, result in zip(indices, extrapolate_matrix(matrix, part2).tolist()):
+            predictions[index] = result
+    return predictions
+
+class Predictor:
+    """
+    Class representing a sequence that is read one element at a time and can be extrapolated at any moment.
+
+    Only the last (and the first) element of each level of differences is kept: appending an element updates the
+    lasts in O(depth), the next element is the sum of the lasts and the previous element follows from the firsts.
+    Every element adds a level, unless max_depth is given: then differences beyond max_depth levels count as zero
+    (a polynomial of a degree below max_depth), which keeps memory and the cost of an element constant.
+    """
+    def __init__(self, readings=(), max_depth=None) -> None:
+        self.max_depth = max_depth
+        self.lasts = []
+        self.firsts = []
+        self.count = 0
+        self.extend(readings)
+
+    def __len__(self) -> int:
+        return self.count
+
+    def append(self, reading: int) -> None:
+        """
+        Add the next element of the sequence.
+
+        Args:
+            reading (int): The element.
+        """
+        self.count += 1
+        diff = reading
+        for level, last in enumerate(self.lasts):
+            self.lasts[level] = diff
+            diff -= last
+        # Every element adds one level of differences, which starts with it, up to max_depth levels
+        if self.max_depth is None or len(self.lasts) < self.max_depth:
+            self.lasts.append(diff)
+            self.firsts.append(diff)
+
+    def extend(self, readings) -> None:
+        """
+        Add the next elements of the sequence.
+
+        Args:
+            readings (list): The elements.
+        """
+        for reading in readings:
+            self.append(reading)
+
+    def predict_next(self) -> int:
+        """
+        Calculate the next element of the sequence.
+
+        Returns:
+            int: The next element.
+        """
+        return sum(self.lasts)
+
+    def predict_previous(self) -> int:
+        """
+        Calculate the element before the sequence.
+
+        Returns:
+            int: The previous element.
+        """
+        prev = 0
+        for first in reversed(self.firsts):
+            prev = first - prev
+        return prev
+
+def day9(file, part2=False, matrix=False):
     """
     Solve Day 9 problem.
 
     Args:
         file (str): The path to the input file.
         part2 (bool): Flag indicating whether to consider part 2.
+        matrix (bool): Flag to extrapolate all sequences at once with binomial weights.
 
     """
+    if matrix:
+        print(sum(sum(extrapolate_matrix(rows, part2).tolist()) for rows in read_matrices(file)))
+        return
+
     data = read_input(file)
     predictions = []
     for history in data:
@@ -121,6 +299,25 @@ def day9(file, part2=False):
 
     print(sum(predictions))
 
+def day9_stream(file, part2=False):
+    """
+    Solve Day 9 problem, feeding each sequence to a predictor one element at a time.
+
+    Args:
+        file (str): The path to the input file.
+        part2 (bool): Flag indicating whether to consider part 2.
+    """
+    total = 0
+    input_file = pathlib.Path(file)
+    with input_file.open('r') as file:
+        for line in file:
+            if not line.strip():
+                continue
+            predictor = Predictor(map(int, line.split()))
+            total += predictor.predict_previous() if part2 else predictor.predict_next()
+
+    print(total)
+
 # Unnecesssary functions if you just use reversed sequence for part 2
 
 def get_firsts(lst: list) -> list:
@@ -157,4 +354,6 @@ def get_prev(lst: list) -> int:
         cursor += 1
     return prev
 
-day9("day9_input.txt", True)
+if __name__ == "__main__":
+    day9("day9_input.txt")
+    day9("day9_input.txt", True)
@@ -0,0 +1,114 @@
+""" ADVENT OF CODE 2023 """
+
+import time
+
+_STARTED = time.perf_counter()
+
+import importlib
+import sys
+
+# Solver per (day, part): function name in the day module and its extra arguments
+SOLVERS = {
+    (1, 1): ('day1', ()),
+    (1, 2): ('day1', (True,)),
+    (2, 1): ('day2', ()),
+    (2, 2): ('day2_2', ()),
+    (3, 1): ('day3', ()),
+    (3, 2): ('day3_2', ()),
+    (4, 1): ('day4', ()),
+    (4, 2): ('day4_2', ()),
+    (5, 1): ('day5', ()),
+    (5, 2): ('day5_2', ()),
+    (6, 1): ('day6', ()),
+    (6, 2): ('day6_2', ()),
+    (7, 1): ('day7', ()),
+    (7, 2): ('day7', (True,)),
+    (8, 1): ('day8', ()),
+    (8, 2): ('day8_2', ()),
+    (9, 1): ('day9', ()),
+    (9, 2): ('day9', (True,)),
+    (11, 1): ('day11', ()),
+    (11, 2): ('day11', (1000000,)),
+    (14, 1): ('day14', ()),
+    (14, 2): ('day14_2', ()),
+    (15, 1): ('day15', ()),
+    (15, 2): ('day15_2', ()),
+}
+
+def get_solver(day: int, part: int) -> tuple:
+    """
+    Import only the module of the requested day and look up the solver of a part.
+
+    Args:
+        day (int): The day of the puzzle.
+        part (int): The part of the puzzle (1 or 2).
+
+    Returns:
+        tuple: The solver function, its extra arguments and the import time in seconds.
+    """
+    if (day, part) not in SOLVERS:
+        raise ValueError(f"no solver for day {day} part {part}")
+    name, args = SOLVERS[(day, part)]
+    started = time.perf_counter()
+    module = importlib.import_module(f"AOC2023_Day{day}")
+    import_time = time.perf_counter() - started
+    return (getattr(module, name), args, import_time)
+
+def run(day: int, part: int, file=None, timing=False) -> None:
+    """
+    Solve one part of a day, optionally reporting the time spent on imports, startup and solving.
+
+    The runner startup starts at the first line of aoc.py, so it leaves out starting the interpreter; the process CPU
+    time before solving includes it.
+
+    Args:
+        day (int): The day of the puzzle.
+        part (int): The part of the puzzle (1 or 2).
+        file (str): The path to the input file, defaults to the input of the day.
+        timing (bool): Flag to report timings on stderr.
+    """
+    if file is None:
+        file = f"day{day}_input.txt"
+    solver, args, import_time = get_solver(day, part)
+    # runner startup is this runner and the day module, from the first line of aoc.py (the interpreter has started)
+    startup_time = time.perf_counter() - _STARTED
+    # the CPU time of the process so far also covers starting the interpreter
+    process_time = time.process_time()
+    started = time.perf_counter()
+    solver(file, *args)
+    solve_time = time.perf_counter() - started
+    if timing:
+        print(f"import aoc: {(_IMPORTED - _STARTED) * 1000:.2f} ms, "
+              f"import AOC2023_Day{day}: {import_time * 1000:.2f} ms, "
+              f"runner startup: {startup_time * 1000:.2f} ms, "
+              f"process CPU before solve (with interpreter): {process_time * 1000:.2f} ms, "
+              f"solve: {solve_time * 1000:.2f} ms", file=sys.stderr)
+
+def main(argv=None) -> None:
+    """
+    Command line entry point: aoc.py run DAY [PART] [FILE] [--timing]
+
+    Args:
+        argv (list): The command line arguments, defaults to sys.argv.
+    """
+    # argparse is only needed on the command line, so keep it out of 'import aoc'
+    import argparse
+
+    parser = argparse.ArgumentParser(prog="aoc", description="Advent of Code 2023 solutions")
+    commands = parser.add_subparsers(dest="command", required=True)
+    run_parser = commands.add_parser("run", help="solve one part of a day")
+    run_parser.add_argument("day", type=int)
+    run_parser.add_argument("part", type=int, nargs="?", default=1, choices=(1, 2))
+    run_parser.add_argument("file", nargs="?", help="input file (default: dayN_input.txt)")
+    run_parser.add_argument("--timing", action="store_true", help="report import, runner startup, process CPU and solve time")
+    args = parser.parse_args(argv)
+
+    if args.command == "run":
+        if (args.day, args.part) not in SOLVERS:
+            parser.error(f"no solver for day {args.day} part {args.part}")
+        run(args.day, args.part, args.file, args.timing)
+
+_IMPORTED = time.perf_counter()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,466 @@
+""" ADVENT OF CODE 2023 """
+
+import contextlib
+import importlib
+import io
+import math
+import pathlib
+import random
+import string
+import tempfile
+import time
+import tracemalloc
+
+import aoc
+
+# Benchmarks: generate synthetic inputs of increasing size and time every solver on them
+
+WORDS = ['one', 'two', 'three', 'four', 'five', 'six', 'seven', 'eight', 'nine']
+CARDS = 'AKQJT98765432'
+
+def generate_day1(n: int, rng: random.Random) -> str:
+    """
+    Generate n calibration lines of letters, digits and spelled-out digits.
+
+    Args:
+        n (int): The number of lines.
+        rng (random.Random): The random generator.
+
+    Returns:
+        str: The generated input.
+    """
+    lines = []
+    for _ in range(n):
+        parts = [str(rng.randint(1, 9))]
+        for _ in range(rng.randint(2, 8)):
+            choice = rng.random()
+            if choice < 0.3:
+                parts.append(rng.choice(WORDS))
+            elif choice < 0.5:
+                parts.append(str(rng.randint(0, 9)))
+            else:
+                parts.append(''.join(rng.choices(string.ascii_lowercase, k=rng.randint(1, 5))))
+        rng.shuffle(parts)
+        lines.append(''.join(parts))
+    return '\n'.join(lines) + '\n'
+
+def generate_day2(n: int, rng: random.Random) -> str:
+    """
+    Generate n games of cube draws.
+
+    Args:
+        n (int): The number of games.
+        rng (random.Random): The random generator.
+
+    Returns:
+        str: The generated input.
+    """
+    lines = []
+    for game in range(1, n + 1):
+        game_sets = []
+        for _ in range(rng.randint(1, 6)):
+            colors = rng.sample(['red', 'green', 'blue'], rng.randint(1, 3))
+            game_sets.append(', '.join(f"{rng.randint(1, 20)} {color}" for color in colors))
+        lines.append(f"Game {game}: " + '; '.join(game_sets))
+    return '\n'.join(lines) + '\n'
+
+def generate_day3(n: int, rng: random.Random) -> str:
+    """
+    Generate an n x n engine schematic with numbers, symbols and gears.
+
+    Args:
+        n (int): The size of the grid.
+        rng (random.Random): The random generator.
+
+    Returns:
+        str: The generated input.
+    """
+    rows = []
+    for _ in range(n):
+        row = []
+        while len(row) < n:
+            choice = rng.random()
+            if choice < 0.1:
+                row.extend(str(rng.randint(1, 999)))
+            elif choice < 0.13:
+                row.append(rng.choice('*#+$/=@%&-'))
+            row.append('.')
+        rows.append(''.join(row[:n]))
+    return '\n'.join(rows) + '\n'
+
+def generate_day4(n: int, rng: random.Random) -> str:
+    """
+    Generate n scratchcards with mostly few matches (so copies stay bounded).
+
+    Args:
+        n (int): The number of cards.
+        rng (random.Random): The random generator.
+
+    Returns:
+        str: The generated input.
+    """
+    lines = []
+    for card in range(1, n + 1):
+        winning = rng.sample(range(1, 100), 10)
+        matches = min(rng.choices([0, 1, 2, 3, 5], weights=[60, 25, 10, 4, 1])[0], n - card)
+        others = [number for number in range(1, 100) if number not in winning]
+        numbers = rng.sample(winning, matches) + rng.sample(others, 25 - matches)
+        rng.shuffle(numbers)
+        lines.append(f"Card {card:>4}: " + ' '.join(f"{number:>2}" for number in winning)
+                     + ' | ' + ' '.join(f"{number:>2}" for number in numbers))
+    return '\n'.join(lines) + '\n'
+
+def generate_day5(n: int, rng: random.Random) -> str:
+    """
+    Generate an almanac with 20 seeds and seven maps of n entries each.
+
+    Args:
+        n (int): The number of entries per map.
+        rng (random.Random): The random generator.
+
+    Returns:
+        str: The generated input.
+    """
+    limit = 2 ** 32
+    seeds = []
+    for _ in range(10):
+        start = rng.randrange(limit // 2)
+        seeds.extend([start, rng.randrange(1, limit // 20)])
+    sections = ['seeds: ' + ' '.join(map(str, seeds))]
+    names = ['seed', 'soil', 'fertilizer', 'water', 'light', 'temperature', 'humidity', 'location']
+    for source, destination in zip(names, names[1:]):
+        # cut the source space in n consecutive ranges, leaving some gaps unmapped
+        cuts = sorted(rng.sample(range(1, limit), n))
+        entries = [f"{source}-to-{destination} map:"]
+        for start, end in zip([0] + cuts, cuts + [limit]):
+            if rng.random() < 0.9:
+                entries.append(f"{rng.randrange(limit - (end - start))} {start} {end - start}")
+        sections.append('\n'.join(entries))
+    return '\n\n'.join(sections) + '\n'
+
+def generate_day6(n: int, rng: random.Random) -> str:
+    """
+    Generate n races with winnable records.
+
+    Args:
+        n (int): The number of races.
+        rng (random.Random): The random generator.
+
+    Returns:
+        str: The generated input.
+    """
+    times = [rng.randint(10, 99) for _ in range(n)]
+    distances = [rng.randint(time, time * time // 4 - 1) for time in times]
+    return ("Time:     " + ' '.join(f"{time:>4}" for time in times) + '\n'
+            + "Distance: " + ' '.join(f"{distance:>4}" for distance in distances) + '\n')
+
+def generate_day7(n: int, rng: random.Random) -> str:
+    """
+    Generate n hands with bids (beyond a few thousand hands some repeat, there are only 13^5 different hands).
+
+    Args:
+        n (int): The number of hands.
+        rng (random.Random): The random generator.
+
+    Returns:
+        str: The generated input.
+    """
+    hands = (''.join(rng.choices(CARDS, k=5)) for _ in range(n))
+    return '\n'.join(f"{hand} {rng.randint(1, 1000)}" for hand in hands) + '\n'
+
+def generate_day8(n: int, rng: random.Random) -> str:
+    """
+    Generate a network of about n nodes: six ghost loops, the first one from AAA to ZZZ.
+
+    Args:
+        n (int): The number of nodes.
+        rng (random.Random): The random generator.
+
+    Returns:
+        str: The generated input.
+    """
+    instructions = ''.join(rng.choices('LR', k=rng.randint(50, 300)))
+    lines = []
+    for ghost in range(6):
+        start = 'AAA' if ghost == 0 else f"{ghost}AA"
+        end = 'ZZZ' if ghost == 0 else f"{ghost}ZZ"
+        # chain with both children equal, the end node continues like the start node
+        chain = [f"{ghost}N{index}" for index in range(max(1, n // 6 + rng.randint(0, 10)))]
+        nodes = [start] + chain + [end]
+        for node, child in zip(nodes, nodes[1:]):
+            lines.append(f"{node} = ({child}, {child})")
+        lines.append(f"{end} = ({nodes[1]}, {nodes[1]})")
+    rng.shuffle(lines)
+    return instructions + '\n\n' + '\n'.join(lines) + '\n'
+
+def generate_day9(n: int, rng: random.Random) -> str:
+    """
+    Generate n histories of 21 values of a polynomial of low degree.
+
+    Args:
+        n (int): The number of histories.
+        rng (random.Random): The random generator.
+
+    Returns:
+        str: The generated input.
+    """
+    lines = []
+    for _ in range(n):
+        coefficients = [rng.randint(-9, 9) for _ in range(rng.randint(1, 6))]
+        values = [sum(c * x ** power for power, c in enumerate(coefficients)) for x in range(21)]
+        lines.append(' '.join(map(str, values)))
+    return '\n'.join(lines) + '\n'
+
+def generate_day11(n: int, rng: random.Random) -> str:
+    """
+    Generate an n x n image with sparse galaxies.
+
+    Args:
+        n (int): The size of the grid.
+        rng (random.Random): The random generator.
+
+    Returns:
+        str: The generated input.
+    """
+    rows = [''.join('#' if rng.random() < 0.02 else '.' for _ in range(n)) for _ in range(n)]
+    return '\n'.join(rows) + '\n'
+
+def generate_day14(n: int, rng: random.Random) -> str:
+    """
+    Generate an n x n platform of round and cube rocks.
+
+    Args:
+        n (int): The size of the grid.
+        rng (random.Random): The random generator.
+
+    Returns:
+        str: The generated input.
+    """
+    rows = [''.join(rng.choices('O#.', weights=[2, 2, 6], k=n)) for _ in range(n)]
+    return '\n'.join(rows) + '\n'
+
+def generate_day15(n: int, rng: random.Random) -> str:
+    """
+    Generate an initialization sequence of n steps.
+
+    Args:
+        n (int): The number of steps.
+        rng (random.Random): The random generator.
+
+    Returns:
+        str: The generated input.
+    """
+    labels = [''.join(rng.choices(string.ascii_lowercase, k=rng.randint(2, 6))) for _ in range(max(1, n // 4))]
+    steps = []
+    for _ in range(n):
+        label = rng.choice(labels)
+        steps.append(f"{label}={rng.randint(1, 9)}" if rng.random() < 0.7 else f"{label}-")
+    return ','.join(steps) + '\n'
+
+# Generator and default sizes per day, large enough that the growth between sizes is measurable
+BENCHMARKS = {
+    1: (generate_day1, (10000, 40000, 160000)),
+    2: (generate_day2, (10000, 40000, 160000)),
+    3: (generate_day3, (250, 500, 1000)),
+    4: (generate_day4, (10000, 40000, 160000)),
+    5: (generate_day5, (1000, 4000, 16000)),
+    6: (generate_day6, (250, 500, 1000)),
+    7: (generate_day7, (10000, 100000, 1000000)),
+    8: (generate_day8, (4000, 16000, 64000)),
+    9: (generate_day9, (10000, 40000, 160000)),
+    11: (generate_day11, (100, 200, 400)),
+    14: (generate_day14, (25, 50, 100)),
+    15: (generate_day15, (10000, 40000, 160000)),
+}
+
+# Production sized inputs (--large): 1M lines, hands and almanac entries, and 10k x 10k grids where the solver
+# scales to it (all galaxy pairs of Day 11 and the spin cycles of Day 14 do not, and the answers of Day 6 get too
+# long to print beyond 1000 races)
+LARGE_SIZES = {
+    1: (1000000,),
+    2: (1000000,),
+    3: (10000,),
+    4: (1000000,),
+    5: (1000000,),
+    6: (1000,),
+    7: (1000000,),
+    8: (1000000,),
+    9: (1000000,),
+    11: (2000,),
+    14: (500,),
+    15: (1000000,),
+}
+
+# Reader of the input per day, timed alone as the parse phase (other days parse line by line inside the solver)
+PARSERS = {
+    2: 'read_games',
+    3: 'read_grid',
+    4: 'read_cards',
+    5: 'read_almanac',
+    8: 'read_network',
+    9: 'read_input',
+    11: 'read_grid',
+    14: 'read_grid',
+}
+
+def read_lines(file) -> list:
+    """
+    Read the lines of a file, the parse phase of the days without a reader of their own.
+
+    Args:
+        file (str): The path to the input file.
+
+    Returns:
+        list: The lines.
+    """
+    return pathlib.Path(file).read_text().splitlines()
+
+def get_parser(day: int):
+    """
+    Get the function that parses the input of a day.
+
+    Args:
+        day (int): The day of the puzzle.
+
+    Returns:
+        function: The parser.
+    """
+    if day not in PARSERS:
+        return read_lines
+    return getattr(importlib.import_module(f"AOC2023_Day{day}"), PARSERS[day])
+
+def clear_caches(day: int) -> None:
+    """
+    Clear the functools caches of a day module (automata, tables), so every run starts cold.
+
+    Args:
+        day (int): The day of the puzzle.
+    """
+    module = importlib.import_module(f"AOC2023_Day{day}")
+    for value in vars(module).values():
+        if callable(getattr(value, 'cache_clear', None)):
+            value.cache_clear()
+
+def measure(day: int, solver, args: tuple, file: str, memory=True) -> tuple:
+    """
+    Run a solver with its output suppressed: the parse phase alone, the whole part for wall time, and the whole part
+    again for peak memory. Caches are cleared before each run.
+
+    Args:
+        day (int): The day of the puzzle.
+        solver (function): The solver to run.
+        args (tuple): The extra arguments of the solver.
+        file (str): The path to the input file.
+        memory (bool): Flag to trace the peak memory in a separate run.
+
+    Returns:
+        tuple: The parse time and the wall time in seconds, and the peak memory in bytes (None if not traced).
+    """
+    parser = get_parser(day)
+    with contextlib.redirect_stdout(io.StringIO()):
+        clear_caches(day)
+        started = time.perf_counter()
+        parser(file)
+        parse_time = time.perf_counter() - started
+
+        clear_caches(day)
+        started = time.perf_counter()
+        solver(file, *args)
+        wall_time = time.perf_counter() - started
+        peak = None
+        # tracing slows down the solver, so memory gets its own run
+        if memory:
+            clear_caches(day)
+            tracemalloc.start()
+            try:
+                solver(file, *args)
+                peak = tracemalloc.get_traced_memory()[1]
+            finally:
+                tracemalloc.stop()
+    return (parse_time, wall_time, peak)
+
+def growth(size: int, wall_time: float, previous: tuple) -> str:
+    """
+    Estimate the exponent k in time ~ size^k from the previous measurement.
+
+    Args:
+        size (int): The input size in bytes.
+        wall_time (float): The wall time in seconds.
+        previous (tuple): The previous input size and wall time, or None.
+
+    Returns:
+        str: The formatted exponent, '-' if there is nothing to compare with.
+    """
+    if not previous or previous[0] == size or min(previous[1], wall_time) <= 0:
+        return '-'
+    return f"{math.log(wall_time / previous[1]) / math.log(size / previous[0]):.2f}"
+
+def benchmark(days=None, sizes=None, memory=True, seed=2023, large=False) -> None:
+    """
+    Benchmark every part of the selected days on generated inputs of increasing size.
+
+    The parse phase is the reader of the day timed alone, the solve phase is the rest of the part.
+
+    Args:
+        days (list): The days to benchmark, defaults to all days with a generator.
+        sizes (list): The sizes to generate, defaults to the sizes of each day.
+        memory (bool): Flag to measure the peak memory.
+        seed (int): The seed of the random generator.
+        large (bool): Flag to use the production sized inputs of each day instead of the default sizes.
+    """
+    days = days or sorted(BENCHMARKS)
+    print(f"{'day':>3} {'part':>4} {'size':>8} {'bytes':>12} {'parse (s)':>10} {'solve (s)':>10} {'time (s)':>10} "
+          f"{'peak (MiB)':>11} {'growth':>7}")
+    with tempfile.TemporaryDirectory() as directory:
+        for day in days:
+            generator, default_sizes = BENCHMARKS[day]
+            if large:
+                default_sizes = LARGE_SIZES[day]
+            inputs = []
+            # generate inputs once per day, all parts share them
+            for size in sizes or default_sizes:
+                file = pathlib.Path(directory) / f"day{day}_{size}.txt"
+                file.write_text(generator(size, random.Random(seed)))
+                inputs.append((size, file))
+            for part in (1, 2):
+                solver, args, _ = aoc.get_solver(day, part)
+                # warm up on the smallest input, so lazy imports (NumPy) are not timed
+                try:
+                    measure(day, solver, args, str(inputs[0][1]), memory=False)
+                except Exception:
+                    pass
+                previous = None
+                for size, file in inputs:
+                    size_bytes = file.stat().st_size
+                    try:
+                        parse_time, wall_time, peak = measure(day, solver, args, str(file), memory)
+                    except Exception as error:
+                        print(f"{day:>3} {part:>4} {size:>8} {size_bytes:>12} error: {type(error).__name__}: {error}")
+                        previous = None
+                        continue
+                    peak_text = f"{peak / 2 ** 20:.2f}" if peak is not None else '-'
+                    solve_time = max(wall_time - parse_time, 0)
+                    print(f"{day:>3} {part:>4} {size:>8} {size_bytes:>12} {parse_time:>10.4f} {solve_time:>10.4f} "
+                          f"{wall_time:>10.4f} {peak_text:>11} {growth(size_bytes, wall_time, previous):>7}", flush=True)
+                    previous = (size_bytes, wall_time)
+
+def main(argv=None) -> None:
+    """
+    Command line entry point: aoc_bench.py [--days D ...] [--sizes N ... | --large] [--no-memory] [--seed S]
+
+    Args:
+        argv (list): The command line arguments, defaults to sys.argv.
+    """
+    import argparse
+
+    parser = argparse.ArgumentParser(prog="aoc_bench", description="Benchmark Advent of Code 2023 solutions")
+    parser.add_argument("--days", type=int, nargs="+", choices=sorted(BENCHMARKS), help="days to benchmark")
+    parser.add_argument("--sizes", type=int, nargs="+", help="input sizes (lines, entries or grid side per day)")
+    parser.add_argument("--large", action="store_true", help="use production sized inputs (1M lines, 10k grids)")
+    parser.add_argument("--no-memory", action="store_true", help="skip the traced run for peak memory")
+    parser.add_argument("--seed", type=int, default=2023, help="seed of the input generator")
+    args = parser.parse_args(argv)
+    benchmark(args.days, args.sizes, not args.no_memory, args.seed, args.large)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,239 @@
+""" ADVENT OF CODE 2023 """
+
+import mmap
+import pathlib
+
+# Grid shared by the days with a 2D puzzle input
+
+class Grid:
+    """
+    Class representing a rectangular grid of characters kept in one bytes buffer.
+
+    Rows are stored one after another, every stride bytes (width plus the line ending).
+    Indexing with an int gives a row as a string, indexing with (x, y) gives one character.
+    """
+    def __init__(self, data, width: int, height: int, stride=None) -> None:
+        self.data = data
+        self.width = width
+        self.height = height
+        self.stride = width if stride is None else stride
+
+    @classmethod
+    def from_file(cls, file, use_mmap=True) -> 'Grid':
+        """
+        Read a grid from a text file, memory-mapped if possible.
+
+        Args:
+            file (str): The path to the input file.
+            use_mmap (bool): Flag to map the file instead of reading it into memory.
+
+        Returns:
+            Grid: The grid read from the file (trailing empty lines are ignored).
+        """
+        input_file = pathlib.Path(file)
+        with input_file.open('rb') as file:
+            if use_mmap and input_file.stat().st_size:
+                data = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+            else:
+                data = file.read()
+        return cls.from_buffer(data)
+
+    @classmethod
+    def from_buffer(cls, data) -> 'Grid':
+        """
+        Make a grid of a buffer with lines of equal length (without copying).
+
+        Args:
+            data (bytes): The buffer with the lines of the grid.
+
+        Returns:
+            Grid: The grid on top of the buffer.
+        """
+        # ignore trailing whitespace (empty lines at the end of the file)
+        end = len(data)
+        while end and data[end - 1] in b'\r\n \t':
+            end -= 1
+        if not end:
+            return cls(b'', 0, 0)
+        width = data.find(b'\n', 0, end)
+        if width < 0:
+            return cls(data, end, 1, end + 1)
+        stride = width + 1
+        if data[width - 1:width] == b'\r':
+            width -= 1
+        height = (end + stride - width) // stride
+        if (height - 1) * stride + width != end:
+            raise ValueError("rows of the grid differ in length")
+        return cls(data, width, height, stride)
+
+    @classmethod
+    def from_rows(cls, rows) -> 'Grid':
+        """
+        Make a grid of rows.
+
+        Args:
+            rows (list): The rows as strings or bytes.
+
+        Returns:
+            Grid: The grid of the rows.
+        """
+        rows = [row.encode() if isinstance(row, str) else bytes(row) for row in rows]
+        width = len(rows[0]) if rows else 0
+        return cls(b''.join(rows), width, len(rows))
+
+    def __len__(self) -> int:
+        return self.height
+
+    def __getitem__(self, key):
+        """
+        Get a row or a character.
+
+        Args:
+            key (int or tuple): The row index, or the (row, column) position.
+
+        Returns:
+            str: The row, or the character at the position (negative indices count from the end).
+        """
+        if isinstance(key, tuple):
+            x, y = key
+            if x < 0:
+                x += self.height
+            if y < 0:
+                y += self.width
+            if not (0 <= x < self.height and 0 <= y < self.width):
+                raise IndexError("grid position out of range")
+            return chr(self.data[x * self.stride + y])
+        return self.row(key)
+
+    def __iter__(self):
+        for x in range(self.height):
+            yield self.row(x)
+
+    def __eq__(self, other) -> bool:
+        if not isinstance(other, Grid):
+            return NotImplemented
+        return self.width == other.width and self.height == other.height and self.tobytes() == other.tobytes()
+
+    def __hash__(self) -> int:
+        return hash((self.width, self.height, self.tobytes()))
+
+    def __str__(self) -> str:
+        return '\n'.join(self)
+
+    def row_bytes(self, x: int) -> bytes:
+        """
+        Get a row of the grid as bytes.
+
+        Args:
+            x (int): The index of the row.
+
+        Returns:
+            bytes: The row.
+        """
+        if x < 0:
+            x += self.height
+        if not 0 <= x < self.height:
+            raise IndexError("grid row out of range")
+        start = x * self.stride
+        return self.data[start:start + self.width]
+
+    def row(self, x: int) -> str:
+        """
+        Get a row of the grid.
+
+        Args:
+            x (int): The index of the row.
+
+        Returns:
+            str: The row.
+        """
+        return self.row_bytes(x).decode('ascii')
+
+    def column_bytes(self, y: int) -> bytes:
+        """
+        Get a column of the grid as bytes.
+
+        Args:
+            y (int): The index of the column.
+
+        Returns:
+            bytes: The column, top to bottom.
+        """
+        if y < 0:
+            y += self.width
+        if not 0 <= y < self.width:
+            raise IndexError("grid column out of range")
+        return self.data[y:(self.height - 1) * self.stride + y + 1:self.stride]
+
+    def column(self, y: int) -> str:
+        """
+        Get a column of the grid.
+
+        Args:
+            y (int): The index of the column.
+
+        Returns:
+            str: The column, top to bottom.
+        """
+        return self.column_bytes(y).decode('ascii')
+
+    def tobytes(self) -> bytes:
+        """
+        Get the characters of the grid row after row, without line endings.
+
+        Returns:
+            bytes: The characters of the grid.
+        """
+        if self.stride == self.width:
+            return bytes(self.data[:self.width * self.height])
+        return b''.join(self.row_bytes(x) for x in range(self.height))
+
+    def find_all(self, char: chr) -> list:
+        """
+        Find the positions of a character in the grid.
+
+        Args:
+            char (chr): The character to find.
+
+        Returns:
+            list: List of (row, column) positions, row by row.
+        """
+        positions = []
+        byte = char.encode('ascii')
+        index = self.data.find(byte)
+        while index >= 0:
+            x, y = divmod(index, self.stride)
+            # a line ending never matches a grid character, but stay inside the grid
+            if x >= self.height:
+                break
+            positions.append((x, y))
+            index = self.data.find(byte, index + 1)
+        return positions
+
+    def to_numpy(self):
+        """
+        Get a read-only NumPy uint8 view of the grid (no copy of the buffer).
+
+        Returns:
+            numpy.ndarray: Array of shape (height, width) with the character codes.
+        """
+        import numpy
+        from numpy.lib.stride_tricks import as_strided
+
+        if not self.height:
+            return numpy.zeros((0, 0), dtype=numpy.uint8)
+        buffer = numpy.frombuffer(self.data, dtype=numpy.uint8)
+        return as_strided(buffer, shape=(self.height, self.width), strides=(self.stride, 1), writeable=False)
+
+def read_grid(file, use_mmap=True) -> Grid:
+    """
+    Reads a grid from a text file.
+
+    Args:
+        file (str): The path to the input file.
+        use_mmap (bool): Flag to map the file instead of reading it into memory.
+
+    Returns:
+        Grid: The grid read from the file.
+    """
+    return Grid.from_file(file, use_mmap)